@@ -3,7 +3,16 @@ DatabunkerPro Python Client Library
 A Python client library for interacting with the DatabunkerPro API.
 """
 
-from .api import DatabunkerproAPI
+from .api import DatabunkerproAPI, DatabunkerproError
+from .async_api import AsyncBatcher, AsyncDatabunkerproAPI
+from .cache import CacheBackend, RedisCache
 
 __version__ = "0.1.1"
-__all__ = ["DatabunkerproAPI"]
+__all__ = [
+    "DatabunkerproAPI",
+    "DatabunkerproError",
+    "AsyncDatabunkerproAPI",
+    "AsyncBatcher",
+    "CacheBackend",
+    "RedisCache",
+]
@@ -1,11 +1,235 @@
 """DatabunkerPro API Client"""
 
+import copy
+import gzip
+import hashlib
+import importlib
 import json
-import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Any, Dict, List, Optional, TypedDict, Union, cast
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypedDict,
+    Union,
+    cast,
+)
 
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import CacheBackend
+
+
+def _optional_module(name: str) -> Optional[ModuleType]:
+    """Import an optional dependency, returning None when it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+
+
+orjson = _optional_module("orjson")
+ijson = _optional_module("ijson")
+zstandard = _optional_module("zstandard")
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode values the stdlib json module does not handle, as orjson does.
+
+    Array types such as numpy arrays are written out as lists.
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    tolist = getattr(obj, "tolist", None)
+    if tolist is not None:
+        return tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a request body to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        encoded: bytes = orjson.dumps(
+            obj, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+        return encoded
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+
+def _canonical(obj: Any) -> str:
+    """Serialize a value with sorted keys, for use in cache and dedup keys."""
+    if orjson is not None:
+        encoded: bytes = orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS)
+        return encoded.decode()
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str
+    )
+
+
+def _encode_body(
+    data: Optional[Dict[str, Any]],
+    request_metadata: Optional[Dict[str, Any]] = None,
+) -> Optional[bytes]:
+    """Serialize a request body, attaching request_metadata when given."""
+    if request_metadata:
+        return _dumps({**(data or {}), "request_metadata": request_metadata})
+    if data:
+        return _dumps(data)
+    return None
+
+
+def _loads(content: Union[str, bytes]) -> Any:
+    """Parse a response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _error_result(status_code: int, content: bytes) -> Dict[str, Any]:
+    """Build the error result for a non-2xx response body."""
+    # Error pages from proxies are often HTML or empty; only parse a
+    # body that looks like a JSON object instead of failing on it.
+    content = content.lstrip()
+    try:
+        error = _loads(content) if content[:1] == b"{" else {}
+    except ValueError:
+        error = {}
+    if error.get("status"):
+        return cast(Dict[str, Any], error)
+    return {
+        "status": "error",
+        "message": error.get("message", f"API request failed (HTTP {status_code})"),
+    }
+
+
+_SCALAR_EVENTS = ("string", "number", "boolean", "null")
+
+
+def _top_level_fields(
+    events: Iterable[Tuple[str, str, Any]], fields: Dict[str, Any]
+) -> Iterator[Tuple[str, str, Any]]:
+    """Pass ijson parse events through, copying top-level scalars into fields."""
+    for prefix, event, value in events:
+        if prefix and "." not in prefix and event in _SCALAR_EVENTS:
+            fields[prefix] = value
+        yield prefix, event, value
+
+
+class DatabunkerproError(Exception):
+    """Raised by the iter_* methods when a request fails.
+
+    The error result the other methods would have returned is kept in
+    ``result``.
+    """
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("message", "API request failed"))
+        self.result = result
+
+
+def _parse_metric_lines(lines: Iterable[str]) -> Dict[str, Any]:
+    """Collect the samples of Prometheus text-format lines into a dictionary.
+
+    Each sample line is "name value" or "name{labels} value", optionally
+    followed by a timestamp. Keys keep the "name{labels}" form. Lines are
+    split with str.find, str.rfind and str.split rather than a regex.
+    """
+    metrics: Dict[str, Any] = {}
+    for line in lines:
+        if not line or line[0] == "#":
+            continue
+        brace = line.find("{")
+        if brace == -1:
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            metric_key, value = fields[0], fields[1]
+        else:
+            close = line.rfind("}")
+            fields = line[close + 1 :].split()
+            if close < brace or not fields:
+                continue
+            metric_key = line[: close + 1] if close > brace + 1 else line[:brace]
+            value = fields[0]
+        try:
+            metrics[metric_key] = float(value)
+        except ValueError:
+            continue
+    return metrics
+
+
+def _is_id(value: Any) -> bool:
+    """Tell whether a group or role reference is a numeric id rather than a name."""
+    if isinstance(value, int):
+        return True
+    if isinstance(value, str):
+        # isdigit() alone accepts characters such as "²" that int() rejects.
+        return value.isascii() and value.isdigit()
+    return False
+
+
+def _ref_field(ref: Any, name_key: str, id_key: str) -> Tuple[str, Any]:
+    """Pick the id or name field for a reference that may be either."""
+    if _is_id(ref):
+        return id_key, int(ref)
+    return name_key, str(ref)
+
+
+def _reference(options: Any, name_key: str, id_key: str) -> Tuple[str, Any]:
+    """Resolve a name-or-id option pair to the single key the API expects."""
+    name = options.get(name_key)
+    if name is None:
+        value = options.get(id_key)
+        return id_key, None if value is None else int(value)
+    return _ref_field(name, name_key, id_key)
+
+
+def _user_extract(options: Any) -> Dict[str, Any]:
+    """Collect the group, role and expiry fields of user options in one pass."""
+    group_key, group = _reference(options, "groupname", "groupid")
+    role_key, role = _reference(options, "rolename", "roleid")
+    return {
+        key: value
+        for key, value in (
+            (group_key, group),
+            (role_key, role),
+            ("slidingtime", options.get("slidingtime")),
+            ("finaltime", options.get("finaltime")),
+        )
+        if value is not None
+    }
+
+
+def _missing_fields(**fields: Any) -> Optional[Dict[str, Any]]:
+    """Return an error result if any required field is None or empty."""
+    missing = [name for name, value in fields.items() if value is None or value == ""]
+    if missing:
+        return {
+            "status": "error",
+            "message": f"Missing required field: {', '.join(missing)}",
+        }
+    return None
+
+
+def _pick(options: Any, *keys: str) -> Dict[str, Any]:
+    """Take the given keys from options, leaving out unset and None values."""
+    return {key: options[key] for key in keys if options.get(key) is not None}
 
 
 # Type definitions for better type safety and documentation
@@ -156,13 +380,276 @@ class PatchOperation(TypedDict, total=False):
 class DatabunkerproAPI:
     """Main client class for interacting with the DatabunkerPro API."""
 
+    _shared_sessions: Dict[Tuple[Any, ...], requests.Session] = {}
+    _shared_lock = threading.Lock()
+
     def __init__(
-        self, base_url: str, x_bunker_token: str = "", x_bunker_tenant: str = ""
+        self,
+        base_url: str,
+        x_bunker_token: str = "",
+        x_bunker_tenant: str = "",
+        cache_ttl: float = 0,
+        cache_size: int = 256,
+        negative_cache_ttl: float = 0,
+        max_retries: int = 3,
+        breaker_threshold: int = 0,
+        breaker_cooldown: float = 30,
+        compress_threshold: int = 0,
+        compression: str = "gzip",
+        idempotency_ttl: float = 0,
+        pool_maxsize: int = 10,
+        share_session: bool = False,
+        outbox_workers: int = 1,
+        cache_backend: Optional[CacheBackend] = None,
+        timeout: Union[float, Tuple[float, float], None] = None,
     ):
-        """Initialize the DatabunkerPro API client."""
+        """Initialize the DatabunkerPro API client.
+
+        Set cache_ttl (in seconds) to cache the results of the read-only
+        calls get_user, get_app_data, get_token, get_group, get_tenant,
+        get_policy, get_ui_conf, get_tenant_conf, list_user_agreements and
+        the list_* calls for groups, tenants, app names, policies, agreements
+        and processing activities; write calls drop the cached entries they
+        affect. Set
+        negative_cache_ttl to remember "not found" answers from get_session,
+        get_shared_record and get_user_agreement for that long.
+        Both caches are disabled by default. Pass a cache_backend such as
+        RedisCache to keep the cache_ttl entries there instead of in this
+        process, so several clients or worker processes share them.
+
+        Failed connections and 429/503 answers are retried up to max_retries
+        times with exponential backoff. When breaker_threshold is set, that
+        many consecutive connection failures make the client return an error
+        without contacting the server for breaker_cooldown seconds; after that
+        a single probe request is sent, and the breaker only closes if it
+        gets through.
+
+        Set compress_threshold to compress request bodies of at least that many
+        bytes, for example 4096 for bulk user and token uploads. compression
+        selects "gzip" or "zstd" (the latter needs the zstandard package).
+
+        Set idempotency_ttl to have create calls (roles, policies, shared
+        records) with an identical payload return the first successful result
+        for that many seconds instead of being sent again.
+
+        pool_maxsize bounds the keep-alive connections kept open to the
+        server, and the number of threads the *_bulk getters use. With
+        share_session=True, clients created with the same URL, credentials
+        and pool settings reuse one process-wide session, which suits code
+        that builds a client per incoming web request.
+
+        outbox_workers sets how many calls queued with defer() may be in
+        flight at once; the default of 1 keeps them strictly in order.
+
+        timeout (in seconds) bounds how long a call waits to connect and
+        between bytes of the answer; by default it waits indefinitely. Pass a
+        (connect, read) tuple to bound the two separately.
+        """
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._api_url = f"{self.base_url}/v2/"
+        self._metrics_url = f"{self.base_url}/metrics"
         self.x_bunker_token = x_bunker_token
         self.x_bunker_tenant = x_bunker_tenant
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.negative_cache_ttl = negative_cache_ttl
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._tombstones: "OrderedDict[str, Any]" = OrderedDict()
+        self.idempotency_ttl = idempotency_ttl
+        self._replays: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        # Bumped by every invalidation, so a read that was in flight while a
+        # write happened does not cache its possibly stale result.
+        self._generation = 0
+        self._cache_backend = cache_backend
+        # Shared cache entries are scoped to the server and the credential,
+        # so clients with different tokens never read each other's results.
+        self._cache_scope = hashlib.blake2b(
+            f"{self.base_url}\n{x_bunker_tenant}\n{x_bunker_token}".encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+        self._cache_lock = threading.Lock()
+        self.pool_maxsize = pool_maxsize
+        # A single session keeps connections alive between calls, so only the
+        # first request to the server pays for the TCP and TLS handshake.
+        session_key = (
+            self.base_url,
+            x_bunker_token,
+            x_bunker_tenant,
+            max_retries,
+            pool_maxsize,
+        )
+        self._owns_session = not share_session
+        if share_session:
+            with DatabunkerproAPI._shared_lock:
+                session = DatabunkerproAPI._shared_sessions.get(session_key)
+                if session is None:
+                    session = self._build_session(max_retries, pool_maxsize)
+                    DatabunkerproAPI._shared_sessions[session_key] = session
+            self._session = session
+        else:
+            self._session = self._build_session(max_retries, pool_maxsize)
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._failures = 0
+        self._breaker_open_until = 0.0
+        self._breaker_probing = False
+        self._breaker_lock = threading.Lock()
+        if compression not in ("gzip", "zstd"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        self.compress_threshold = compress_threshold
+        self.compression = compression
+        self.outbox_workers = outbox_workers
+        self._outbox: Optional[ThreadPoolExecutor] = None
+        self._pending: "set[Future[Dict[str, Any]]]" = set()
+
+    def _build_session(self, max_retries: int, pool_maxsize: int) -> requests.Session:
+        """Create a session carrying the auth headers and retry policy."""
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        if self.x_bunker_token:
+            session.headers["X-Bunker-Token"] = self.x_bunker_token
+        if self.x_bunker_tenant:
+            session.headers["X-Bunker-Tenant"] = self.x_bunker_tenant
+        # Only retry when the server cannot have acted on the request: the
+        # connection failed, or it answered 429/503. API calls are POSTs and
+        # are not all idempotent, so read errors are not retried.
+        retry = Retry(
+            total=max_retries,
+            read=0,
+            backoff_factor=0.2,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """Close the underlying HTTP session and release pooled connections.
+
+        Calls queued with defer() are sent before the session is closed. A
+        shared session (share_session=True) stays open for other clients.
+        """
+        if self._outbox is not None:
+            self._outbox.shutdown(wait=True)
+            self._outbox = None
+        if self._owns_session:
+            self._session.close()
+
+    def defer(
+        self, method: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any
+    ) -> "Future[Dict[str, Any]]":
+        """
+        Queue an API call to be sent from a background thread.
+
+        The caller does not wait for the server; the returned future resolves
+        to the usual result dict. Calls are sent in the order they were
+        deferred, up to outbox_workers at a time. Suited to calls whose answer
+        the caller does not need right away, such as request_user_update,
+        request_user_deletion, request_app_data_update or accept_agreement.
+
+        Example:
+            >>> future = api.defer(api.request_user_deletion, "email", email)
+            >>> api.flush()
+            >>> future.result()["status"]
+            'ok'
+        """
+        if self._outbox is None:
+            self._outbox = ThreadPoolExecutor(
+                max_workers=self.outbox_workers,
+                thread_name_prefix="databunkerpro-outbox",
+            )
+        future = self._outbox.submit(method, *args, **kwargs)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every call queued with defer() has been sent."""
+        wait(list(self._pending), timeout=timeout)
+
+    def gather(self, calls: List[Callable[[], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Run several API calls concurrently and return their results in order.
+
+        Calls share this client's connection pool and run on at most
+        pool_maxsize threads, so raise pool_maxsize for wider fan-out.
+
+        Example:
+            >>> from functools import partial
+            >>> results = api.gather(
+            ...     [partial(api.get_group, group) for group in groups]
+            ... )
+        """
+        return self._fan_out(lambda call: call(), calls)
+
+    @staticmethod
+    def prepare_payload(value: Any) -> Any:
+        """
+        Serialize a value once so it can be reused in many request bodies.
+
+        Pass the result wherever the original value would go, for example as
+        the policy of create_policy when registering many policies from one
+        template, or as the request_metadata repeated on every call of a bulk
+        job. Needs orjson 3.9 or newer; otherwise value is returned as-is.
+
+        Example:
+            >>> template = api.prepare_payload(policy_document)
+            >>> for name in names:
+            ...     api.create_policy({"policyname": name, "policy": template})
+            >>> metadata = api.prepare_payload({"auditor": "nightly-sync"})
+            >>> for token in tokens:
+            ...     api.delete_token(token, request_metadata=metadata)
+        """
+        if orjson is None or not hasattr(orjson, "Fragment"):
+            return value
+        return orjson.Fragment(orjson.dumps(value))
+
+    def watch(
+        self,
+        method: Callable[..., Dict[str, Any]],
+        *args: Any,
+        interval: float = 5.0,
+        max_polls: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Poll a read call and yield its result only when it changes.
+
+        Useful for dashboards that follow list_user_sessions or
+        list_user_requests: unchanged polls are skipped instead of being
+        handed back to the caller to diff.
+
+        Example:
+            >>> for result in api.watch(api.list_user_requests, "email", email):
+            ...     print(result["rows"])
+        """
+        previous = None
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            if polls:
+                time.sleep(interval)
+            polls += 1
+            result = method(*args, **kwargs)
+            fingerprint = _canonical(result)
+            if fingerprint != previous:
+                previous = fingerprint
+                yield result
+
+    def __enter__(self) -> "DatabunkerproAPI":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def _make_request(
         self,
@@ -171,36 +658,346 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Make a request to the DatabunkerPro API."""
-        headers = {"Content-Type": "application/json"}
-        if self.x_bunker_token:
-            headers["X-Bunker-Token"] = self.x_bunker_token
-        if self.x_bunker_tenant:
-            headers["X-Bunker-Tenant"] = self.x_bunker_tenant
-
-        url = f"{self.base_url}/v2/{endpoint}"
-        if data or request_metadata:
-            body_data = data.copy() if data else {}
-            if request_metadata:
-                body_data["request_metadata"] = request_metadata
-            body = json.dumps(body_data)
-        else:
-            body = None
-
-        try:
-            response = requests.post(url, headers=headers, data=body)
-            result: Dict[str, Any] = response.json()
-
-            if not response.ok:
-                if result.get("status"):
-                    return result
-                else:
+        body = _encode_body(data, request_metadata)
+        return self._post(self._api_url + endpoint, body)
+
+    def _post(
+        self,
+        url: str,
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Post a serialized body and shape the response into a result dict."""
+        probe = False
+        if self._breaker_open_until:
+            # Once the cooldown is over a single probe request is let through;
+            # everyone else keeps failing fast until it succeeds.
+            with self._breaker_lock:
+                if self._breaker_probing or time.monotonic() < self._breaker_open_until:
                     return {
                         "status": "error",
-                        "message": result.get("message", "API request failed"),
+                        "message": "Server unavailable, skipping request until it "
+                        "recovers",
                     }
-            return result
-        except requests.exceptions.RequestException as e:
+                self._breaker_probing = probe = True
+        if body and self.compress_threshold and len(body) >= self.compress_threshold:
+            if self.compression == "zstd" and zstandard is not None:
+                body = zstandard.ZstdCompressor(level=1).compress(body)
+            else:
+                body = gzip.compress(body, compresslevel=1)
+            headers = {**(headers or {}), "Content-Encoding": self.compression}
+        try:
+            response = self._session.post(
+                url, data=body, headers=headers, timeout=self.timeout
+            )
+            self._failures = 0
+            self._breaker_open_until = 0.0
+            if response.ok:
+                result: Dict[str, Any] = _loads(response.content)
+                return result
+            return _error_result(response.status_code, response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if isinstance(e, requests.exceptions.ConnectionError):
+                self._record_failure()
             return {"status": "error", "message": f"Error making request: {str(e)}"}
+        finally:
+            if probe:
+                self._breaker_probing = False
+
+    def _idempotent_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a create request, replaying the first result for duplicate payloads.
+
+        Every caller gets its own copy of the result, so mutating it does not
+        change what later duplicates replay.
+        """
+        if self.idempotency_ttl <= 0:
+            return self._make_request(endpoint, data, request_metadata)
+        if request_metadata:
+            data = {**data, "request_metadata": request_metadata}
+        canonical = _canonical(data)
+        key = hashlib.blake2b(
+            f"{endpoint}:{canonical}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._replays.get(key)
+            if entry is not None and entry[0] > now:
+                return cast(Dict[str, Any], copy.deepcopy(entry[1]))
+        result = self._post(
+            self._api_url + endpoint, _dumps(data), {"Idempotency-Key": key}
+        )
+        if result.get("status") == "ok":
+            with self._cache_lock:
+                self._replays[key] = (now + self.idempotency_ttl, result)
+                self._replays.move_to_end(key)
+                while len(self._replays) > self.cache_size:
+                    self._replays.popitem(last=False)
+        return copy.deepcopy(result)
+
+    def _record_failure(self) -> None:
+        """Count a failed connection and open the breaker past the threshold."""
+        self._failures += 1
+        if self.breaker_threshold and self._failures >= self.breaker_threshold:
+            self._breaker_open_until = time.monotonic() + self.breaker_cooldown
+
+    def _cached_request(
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a read-only request, serving it from the TTL cache when possible.
+
+        Concurrent identical reads are coalesced: while one thread's request
+        is in flight, other threads asking for the same thing wait for its
+        result instead of sending their own. Every caller gets its own copy of
+        the result, so mutating it does not affect the cache or other callers.
+        """
+        if request_metadata:
+            return self._make_request(endpoint, data, request_metadata)
+        key = f"{endpoint}:{_canonical(data)}"
+        now = time.monotonic()
+        backend = self._cache_backend if self.cache_ttl > 0 else None
+        if backend is not None:
+            hit = backend.get(f"{self._cache_scope}:{key}")
+            if hit is not None:
+                return hit
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(key)
+                return cast(Dict[str, Any], copy.deepcopy(entry[1]))
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if pending is None:
+                pending = self._inflight[key] = Future()
+            generation = self._generation
+        if not leader:
+            return cast(Dict[str, Any], copy.deepcopy(pending.result()))
+        try:
+            result = self._make_request(endpoint, data)
+        except BaseException as e:
+            with self._cache_lock:
+                if self._inflight.get(key) is pending:
+                    del self._inflight[key]
+            pending.set_exception(e)
+            raise
+        with self._cache_lock:
+            cacheable = (
+                self.cache_ttl > 0
+                and result.get("status") == "ok"
+                and generation == self._generation
+            )
+            if cacheable and backend is None:
+                self._cache[key] = (now + self.cache_ttl, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            if self._inflight.get(key) is pending:
+                del self._inflight[key]
+        if cacheable and backend is not None:
+            backend.set(f"{self._cache_scope}:{key}", result, self.cache_ttl)
+            if generation != self._generation:
+                # A write landed while the entry was being stored.
+                backend.invalidate(f"{self._cache_scope}:{key}")
+        pending.set_result(result)
+        return copy.deepcopy(result)
+
+    def _invalidate(self, prefix: str) -> None:
+        """Drop cached results and "not found" answers for endpoints starting
+        with prefix."""
+        with self._cache_lock:
+            self._generation += 1
+            # Reads already in flight may predate the write; later callers
+            # must not join them.
+            for key in [k for k in self._inflight if k.startswith(prefix)]:
+                del self._inflight[key]
+            for key in [k for k in self._cache if k.startswith(prefix)]:
+                del self._cache[key]
+            for key in [k for k in self._tombstones if k.startswith(prefix)]:
+                del self._tombstones[key]
+        if self._cache_backend is not None:
+            self._cache_backend.invalidate(f"{self._cache_scope}:{prefix}")
+
+    def clear_cache(self) -> None:
+        """Drop all cached results."""
+        with self._cache_lock:
+            self._generation += 1
+            self._inflight.clear()
+            self._cache.clear()
+            self._tombstones.clear()
+            self._replays.clear()
+        if self._cache_backend is not None:
+            self._cache_backend.invalidate(f"{self._cache_scope}:")
+
+    def _lookup_or_miss(
+        self,
+        endpoint: str,
+        data: Dict[str, str],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a lookup request, remembering "not found" answers for a short time.
+
+        Requests with request_metadata always go to the server so that they
+        are audited.
+        """
+        if self.negative_cache_ttl <= 0 or request_metadata:
+            return self._make_request(endpoint, data, request_metadata)
+        key = f"{endpoint}:{_canonical(data)}"
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._tombstones.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    return dict(entry[1])
+                del self._tombstones[key]
+        result = self._make_request(endpoint, data, request_metadata)
+        if (
+            result.get("status") == "error"
+            and "not found" in str(result.get("message", "")).lower()
+        ):
+            with self._cache_lock:
+                self._tombstones[key] = (now + self.negative_cache_ttl, result)
+                while len(self._tombstones) > self.cache_size:
+                    self._tombstones.popitem(last=False)
+        return result
+
+    def _forget_miss(self, endpoint: str, data: Dict[str, str]) -> None:
+        """Drop a remembered "not found" answer for the lookup of data."""
+        with self._cache_lock:
+            self._tombstones.pop(f"{endpoint}:{_canonical(data)}", None)
+
+    def _fan_out(
+        self,
+        fetch: Callable[[Any], Dict[str, Any]],
+        refs: List[Any],
+    ) -> List[Dict[str, Any]]:
+        """Call fetch for every ref concurrently and return results in input order."""
+        if len(refs) <= 1:
+            return [fetch(ref) for ref in refs]
+        workers = min(self.pool_maxsize, len(refs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fetch, refs))
+
+    def _in_batches(
+        self,
+        send: Callable[[List[Any]], Dict[str, Any]],
+        items: List[Any],
+        batch_size: int,
+        merge_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send items in concurrent chunks of batch_size and merge the results.
+
+        The merge_key lists of all chunk results are concatenated; the first
+        failed chunk's result is returned (with the merged list) if any failed.
+        """
+        chunks = [
+            items[start : start + batch_size]
+            for start in range(0, len(items), batch_size)
+        ]
+        results = self._fan_out(send, chunks)
+        merged: Dict[str, Any] = {}
+        if merge_key:
+            merged[merge_key] = [
+                item for result in results for item in result.get(merge_key) or []
+            ]
+        for result in results:
+            if result.get("status") != "ok":
+                return {**result, **merged}
+        return {"status": "ok", **merged}
+
+    def _iter_pages(
+        self,
+        fetch: Callable[[int, int], Dict[str, Any]],
+        page_size: int,
+        prefetch: int = 1,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield rows from fetch(offset, limit) pages, keeping up to prefetch
+        following pages in flight while the caller consumes the current one.
+
+        Stops at the first empty or short page and raises DatabunkerproError
+        on a failed one.
+        """
+        with ThreadPoolExecutor(max_workers=prefetch) as pool:
+            pending = deque(
+                pool.submit(fetch, page * page_size, page_size)
+                for page in range(prefetch)
+            )
+            offset = prefetch * page_size
+            while pending:
+                result = pending.popleft().result()
+                if result.get("status") != "ok":
+                    for future in pending:
+                        future.cancel()
+                    raise DatabunkerproError(result)
+                rows = result.get("rows") or []
+                if len(rows) < page_size:
+                    for future in pending:
+                        future.cancel()
+                    yield from rows
+                    return
+                pending.append(pool.submit(fetch, offset, page_size))
+                offset += page_size
+                yield from rows
+
+    def _iter_rows(
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of a list response as they are read from the socket.
+
+        Uses ijson to parse the body incrementally when it is installed, so
+        the full response is never held in memory. Raises DatabunkerproError
+        if the request fails or the response is not a successful list, even
+        after some rows have been yielded.
+        """
+        body = _encode_body(data, request_metadata)
+        try:
+            response = self._session.post(
+                self._api_url + endpoint, data=body, stream=True, timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            raise DatabunkerproError(
+                {"status": "error", "message": f"Error making request: {str(e)}"}
+            ) from e
+        with response:
+            if not response.ok:
+                raise DatabunkerproError(
+                    _error_result(response.status_code, response.content)
+                )
+            read_errors: Tuple[Type[Exception], ...] = (
+                ValueError,
+                requests.exceptions.RequestException,
+                urllib3.exceptions.HTTPError,
+            )
+            if ijson is not None:
+                read_errors += (ijson.JSONError,)
+            try:
+                if ijson is None:
+                    result = _loads(response.content)
+                    if result.get("status") != "ok":
+                        raise DatabunkerproError(result)
+                    yield from result.get("rows") or []
+                    return
+                response.raw.decode_content = True
+                # use_float keeps numbers as float like json/orjson do, instead
+                # of ijson's default Decimal.
+                events = ijson.parse(response.raw, use_float=True)
+                fields: Dict[str, Any] = {}
+                yield from ijson.items(_top_level_fields(events, fields), "rows.item")
+                if fields.get("status") != "ok":
+                    raise DatabunkerproError(fields)
+            except read_errors as e:
+                raise DatabunkerproError(
+                    {"status": "error", "message": f"Error reading response: {str(e)}"}
+                ) from e
 
     def raw_request(
         self,
@@ -209,20 +1006,10 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> bytes:
         """Make a raw request to the DatabunkerPro API and return the response content."""
-        headers = {"Content-Type": "application/json"}
-        if self.x_bunker_token:
-            headers["X-Bunker-Token"] = self.x_bunker_token
-        if self.x_bunker_tenant:
-            headers["X-Bunker-Tenant"] = self.x_bunker_tenant
-        url = f"{self.base_url}/v2/{endpoint}"
-        if data or request_metadata:
-            body_data = data.copy() if data else {}
-            if request_metadata:
-                body_data["request_metadata"] = request_metadata
-            body = json.dumps(body_data)
-        else:
-            body = None
-        response = requests.post(url, headers=headers, data=body)
+        body = _encode_body(data, request_metadata)
+        response = self._session.post(
+            self._api_url + endpoint, data=body, timeout=self.timeout
+        )
         return response.content
 
     # User Management
@@ -235,27 +1022,7 @@ class DatabunkerproAPI:
         """Create a new user in DatabunkerPro."""
         data: Dict[str, Any] = {"profile": profile}
         if options:
-            # Handle groupname/groupid
-            if "groupname" in options and options["groupname"] is not None:
-                if str(options["groupname"]).isdigit():
-                    data["groupid"] = int(options["groupname"])
-                else:
-                    data["groupname"] = options["groupname"]
-            elif "groupid" in options and options["groupid"] is not None:
-                data["groupid"] = int(options["groupid"])
-            # Handle rolename/roleid
-            if "rolename" in options and options["rolename"] is not None:
-                if str(options["rolename"]).isdigit():
-                    data["roleid"] = int(options["rolename"])
-                else:
-                    data["rolename"] = options["rolename"]
-            elif "roleid" in options and options["roleid"] is not None:
-                data["roleid"] = int(options["roleid"])
-            # Handle time parameters
-            if "slidingtime" in options:
-                data["slidingtime"] = options["slidingtime"]
-            if "finaltime" in options:
-                data["finaltime"] = options["finaltime"]
+            data.update(_user_extract(options))
         return self._make_request("UserCreate", data, request_metadata)
 
     def create_users_bulk(
@@ -263,6 +1030,7 @@ class DatabunkerproAPI:
         records: List[Dict[str, Any]],
         options: Optional[BasicOptions] = None,
         request_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Creates multiple users in bulk with their profiles and group information.
@@ -271,6 +1039,8 @@ class DatabunkerproAPI:
             records: Array of user records to create
             options: Global options for all users
             request_metadata: Additional metadata to include with the request
+            batch_size: If set, send the records in concurrent requests of at
+                most this many users and merge the "created" lists
 
         Returns:
             The created users information
@@ -291,46 +1061,22 @@ class DatabunkerproAPI:
                 "slidingtime": "30d"
             })
         """
-        data: Dict[str, Any] = {
-            "records": [
-                {
-                    "profile": record["profile"],
-                    **(
-                        {"groupid": int(record["groupname"])}
-                        if "groupname" in record
-                        and record["groupname"] is not None
-                        and str(record["groupname"]).isdigit()
-                        else (
-                            {"groupname": record["groupname"]}
-                            if "groupname" in record and record["groupname"] is not None
-                            else {}
-                        )
-                    ),
-                    **(
-                        {"groupid": int(record["groupid"])}
-                        if "groupid" in record and record["groupid"] is not None
-                        else {}
-                    ),
-                    **(
-                        {"roleid": int(record["rolename"])}
-                        if "rolename" in record
-                        and record["rolename"] is not None
-                        and str(record["rolename"]).isdigit()
-                        else (
-                            {"rolename": record["rolename"]}
-                            if "rolename" in record and record["rolename"] is not None
-                            else {}
-                        )
-                    ),
-                    **(
-                        {"roleid": int(record["roleid"])}
-                        if "roleid" in record and record["roleid"] is not None
-                        else {}
-                    ),
-                }
-                for record in records
-            ]
-        }
+        if batch_size and len(records) > batch_size:
+            return self._in_batches(
+                lambda chunk: self.create_users_bulk(chunk, options, request_metadata),
+                records,
+                batch_size,
+                "created",
+            )
+        rows: List[Dict[str, Any]] = []
+        for record in records:
+            row: Dict[str, Any] = {"profile": record["profile"]}
+            for name_key, id_key in (("groupname", "groupid"), ("rolename", "roleid")):
+                key, value = _reference(record, name_key, id_key)
+                if value is not None:
+                    row[key] = value
+            rows.append(row)
+        data: Dict[str, Any] = {"records": rows}
         if options:
             if "finaltime" in options:
                 data["finaltime"] = options["finaltime"]
@@ -352,7 +1098,17 @@ class DatabunkerproAPI:
         }
         if version is not None:
             data["version"] = version
-        return self._make_request("UserGet", data, request_metadata)
+        return self._cached_request("UserGet", data, request_metadata)
+
+    def get_users_bulk(
+        self,
+        refs: List[Tuple[str, str]],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get several (mode, identity) users, one result per ref."""
+        return self._fan_out(
+            lambda ref: self.get_user(ref[0], ref[1], None, request_metadata), refs
+        )
 
     def update_user(
         self,
@@ -367,7 +1123,9 @@ class DatabunkerproAPI:
             "identity": identity,
             "profile": profile,
         }
-        return self._make_request("UserUpdate", data, request_metadata)
+        result = self._make_request("UserUpdate", data, request_metadata)
+        self._invalidate("User")
+        return result
 
     def request_user_update(
         self,
@@ -397,7 +1155,9 @@ class DatabunkerproAPI:
             "identity": identity,
             "patch": patch,
         }
-        return self._make_request("UserPatch", data, request_metadata)
+        result = self._make_request("UserPatch", data, request_metadata)
+        self._invalidate("User")
+        return result
 
     def request_user_patch(
         self,
@@ -425,7 +1185,11 @@ class DatabunkerproAPI:
             "mode": mode,
             "identity": identity,
         }
-        return self._make_request("UserDelete", data, request_metadata)
+        result = self._make_request("UserDelete", data, request_metadata)
+        self._invalidate("User")
+        self._invalidate("Appdata")
+        self._invalidate("Agreement")
+        return result
 
     def delete_users_bulk(
         self,
@@ -452,7 +1216,11 @@ class DatabunkerproAPI:
             {'status': 'ok', 'deleted_count': 2}
         """
         data = {"users": users}
-        return self._make_request("UserDeleteBulk", data, request_metadata)
+        result = self._make_request("UserDeleteBulk", data, request_metadata)
+        self._invalidate("User")
+        self._invalidate("Appdata")
+        self._invalidate("Agreement")
+        return result
 
     def request_user_deletion(
         self,
@@ -540,9 +1308,7 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Creates an access token for a user."""
-        data = {"mode": mode, "identity": identity}
-        if options:
-            data.update(cast(Dict[str, Any], options))
+        data: Dict[str, Any] = {"mode": mode, "identity": identity, **(options or {})}
         return self._make_request("XTokenCreateForUser", data, request_metadata)
 
     def create_role_x_token(
@@ -552,13 +1318,8 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Creates an access token for a role."""
-        data: Dict[str, Any] = {}
-        if options:
-            data.update(cast(Dict[str, Any], options))
-        if isinstance(role_ref, int) or str(role_ref).isdigit():
-            data["roleid"] = int(role_ref)
-        else:
-            data["rolename"] = str(role_ref)
+        key, value = _ref_field(role_ref, "rolename", "roleid")
+        data: Dict[str, Any] = {**(options or {}), key: value}
         return self._make_request("XTokenCreateForRole", data, request_metadata)
 
     # User Request Management
@@ -566,10 +1327,9 @@ class DatabunkerproAPI:
         self, request_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Get a specific user request by UUID."""
-        data = {
-            "requestuuid": request_uuid,
-        }
-        return self._make_request("UserRequestGet", data, request_metadata)
+        return self._make_request(
+            "UserRequestGet", {"requestuuid": request_uuid}, request_metadata
+        )
 
     def list_user_requests(
         self,
@@ -588,6 +1348,21 @@ class DatabunkerproAPI:
         }
         return self._make_request("UserRequestListUserRequests", data, request_metadata)
 
+    def iter_user_requests(
+        self,
+        mode: str,
+        identity: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all of a user's requests, prefetching the next page."""
+        return self._iter_pages(
+            lambda offset, limit: self.list_user_requests(
+                mode, identity, offset, limit, request_metadata
+            ),
+            page_size,
+        )
+
     def cancel_user_request(
         self,
         request_uuid: str,
@@ -610,7 +1385,24 @@ class DatabunkerproAPI:
         data = {"requestuuid": request_uuid}
         if options and "reason" in options:
             data["reason"] = options["reason"]
-        return self._make_request("UserRequestApprove", data, request_metadata)
+        result = self._make_request("UserRequestApprove", data, request_metadata)
+        # Approved requests can change profiles, app data or agreements.
+        self._invalidate("User")
+        self._invalidate("Appdata")
+        self._invalidate("Agreement")
+        return result
+
+    def approve_user_requests_bulk(
+        self,
+        request_uuids: List[str],
+        options: Optional[Dict[str, Any]] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Approve several user requests, one result per entry in request_uuids."""
+        return self._fan_out(
+            lambda uuid: self.approve_user_request(uuid, options, request_metadata),
+            request_uuids,
+        )
 
     # App Data Management
     def create_app_data(
@@ -628,7 +1420,9 @@ class DatabunkerproAPI:
             "appname": appname,
             "appdata": appdata,
         }
-        return self._make_request("AppdataCreate", data, request_metadata)
+        result = self._make_request("AppdataCreate", data, request_metadata)
+        self._invalidate("Appdata")
+        return result
 
     def get_app_data(
         self,
@@ -643,7 +1437,7 @@ class DatabunkerproAPI:
             "identity": identity,
             "appname": appname,
         }
-        return self._make_request("AppdataGet", data, request_metadata)
+        return self._cached_request("AppdataGet", data, request_metadata)
 
     def update_app_data(
         self,
@@ -660,7 +1454,9 @@ class DatabunkerproAPI:
             "appname": appname,
             "appdata": appdata,
         }
-        return self._make_request("AppdataUpdate", data, request_metadata)
+        result = self._make_request("AppdataUpdate", data, request_metadata)
+        self._invalidate("Appdata")
+        return result
 
     def request_app_data_update(
         self,
@@ -696,7 +1492,7 @@ class DatabunkerproAPI:
         self, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """List all application names in the system."""
-        return self._make_request("AppdataListAppNames", None, request_metadata)
+        return self._cached_request("AppdataListAppNames", None, request_metadata)
 
     def list_app_data_versions(
         self,
@@ -720,17 +1516,23 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create a legal basis for data processing."""
-        data = {
-            "brief": options.get("brief"),
-            "status": options.get("status"),
-            "module": options.get("module"),
-            "fulldesc": options.get("fulldesc"),
-            "shortdesc": options.get("shortdesc"),
-            "basistype": options.get("basistype"),
-            "requiredmsg": options.get("requiredmsg"),
-            "requiredflag": options.get("requiredflag"),
-        }
-        return self._make_request("LegalBasisCreate", data, request_metadata)
+        error = _missing_fields(brief=options.get("brief"))
+        if error:
+            return error
+        data = _pick(
+            options,
+            "brief",
+            "status",
+            "module",
+            "fulldesc",
+            "shortdesc",
+            "basistype",
+            "requiredmsg",
+            "requiredflag",
+        )
+        result = self._make_request("LegalBasisCreate", data, request_metadata)
+        self._invalidate("LegalBasis")
+        return result
 
     def update_legal_basis(
         self,
@@ -739,35 +1541,31 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Update an existing legal basis."""
-        data: Dict[str, Any] = {"brief": brief}
-        if options.get("status") is not None:
-            data["status"] = options["status"]
-        if options.get("module") is not None:
-            data["module"] = options["module"]
-        if options.get("fulldesc") is not None:
-            data["fulldesc"] = options["fulldesc"]
-        if options.get("shortdesc") is not None:
-            data["shortdesc"] = options["shortdesc"]
-        if options.get("basistype") is not None:
-            data["basistype"] = options["basistype"]
-        if options.get("requiredmsg") is not None:
-            data["requiredmsg"] = options["requiredmsg"]
-        if options.get("requiredflag") is not None:
-            data["requiredflag"] = options["requiredflag"]
-        return self._make_request("LegalBasisUpdate", data, request_metadata)
+        data: Dict[str, Any] = {
+            "brief": brief,
+            **{key: value for key, value in options.items() if value is not None},
+        }
+        result = self._make_request("LegalBasisUpdate", data, request_metadata)
+        self._invalidate("LegalBasis")
+        self._invalidate("Agreement")
+        return result
 
     def delete_legal_basis(
         self, brief: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Delete a legal basis."""
-        data = {"brief": brief}
-        return self._make_request("LegalBasisDelete", data, request_metadata)
+        result = self._make_request(
+            "LegalBasisDelete", {"brief": brief}, request_metadata
+        )
+        self._invalidate("LegalBasis")
+        self._invalidate("Agreement")
+        return result
 
     def list_agreements(
         self, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """List all agreements."""
-        return self._make_request("LegalBasisListAgreements", None, request_metadata)
+        return self._cached_request("LegalBasisListAgreements", None, request_metadata)
 
     # Agreement Management
     def accept_agreement(
@@ -783,20 +1581,11 @@ class DatabunkerproAPI:
             "mode": mode,
             "identity": identity,
             "brief": brief,
+            **{key: value for key, value in options.items() if value},
         }
-        if options.get("agreementmethod"):
-            data["agreementmethod"] = options["agreementmethod"]
-        if options.get("lastmodifiedby"):
-            data["lastmodifiedby"] = options["lastmodifiedby"]
-        if options.get("referencecode"):
-            data["referencecode"] = options["referencecode"]
-        if options.get("starttime"):
-            data["starttime"] = options["starttime"]
-        if options.get("finaltime"):
-            data["finaltime"] = options["finaltime"]
-        if options.get("status"):
-            data["status"] = options["status"]
-        return self._make_request("AgreementAccept", data, request_metadata)
+        result = self._make_request("AgreementAccept", data, request_metadata)
+        self._invalidate("Agreement")
+        return result
 
     def get_user_agreement(
         self,
@@ -811,7 +1600,20 @@ class DatabunkerproAPI:
             "identity": identity,
             "brief": brief,
         }
-        return self._make_request("AgreementGet", data, request_metadata)
+        return self._lookup_or_miss("AgreementGet", data, request_metadata)
+
+    def get_user_agreements_bulk(
+        self,
+        refs: List[Tuple[str, str, str]],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get several (mode, identity, brief) agreements, one result per ref."""
+        return self._fan_out(
+            lambda ref: self.get_user_agreement(
+                ref[0], ref[1], ref[2], request_metadata
+            ),
+            refs,
+        )
 
     def list_user_agreements(
         self,
@@ -824,7 +1626,9 @@ class DatabunkerproAPI:
             "mode": mode,
             "identity": identity,
         }
-        return self._make_request("AgreementListUserAgreements", data, request_metadata)
+        return self._cached_request(
+            "AgreementListUserAgreements", data, request_metadata
+        )
 
     def cancel_agreement(
         self,
@@ -839,7 +1643,9 @@ class DatabunkerproAPI:
             "identity": identity,
             "brief": brief,
         }
-        return self._make_request("AgreementCancel", data, request_metadata)
+        result = self._make_request("AgreementCancel", data, request_metadata)
+        self._invalidate("Agreement")
+        return result
 
     def request_agreement_cancellation(
         self,
@@ -854,21 +1660,34 @@ class DatabunkerproAPI:
             "identity": identity,
             "brief": brief,
         }
-        return self._make_request("AgreementCancelRequest", data, request_metadata)
+        result = self._make_request("AgreementCancelRequest", data, request_metadata)
+        self._invalidate("Agreement")
+        return result
 
     def revoke_all_agreements(
         self, brief: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Revoke all agreements for a specific legal basis."""
-        data = {"brief": brief}
-        return self._make_request("AgreementRevokeAll", data, request_metadata)
+        result = self._make_request(
+            "AgreementRevokeAll", {"brief": brief}, request_metadata
+        )
+        self._invalidate("Agreement")
+        return result
 
     # Processing Activity Management
     def list_processing_activities(
         self, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """List all processing activities."""
-        return self._make_request(
+        return self._cached_request(
+            "ProcessingActivityListActivities", None, request_metadata
+        )
+
+    def iter_processing_activities(
+        self, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all processing activities without loading the whole list."""
+        return self._iter_rows(
             "ProcessingActivityListActivities", None, request_metadata
         )
 
@@ -878,14 +1697,13 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create a new processing activity."""
-        data = {
-            "activity": options.get("activity"),
-            "title": options.get("title"),
-            "script": options.get("script"),
-            "fulldesc": options.get("fulldesc"),
-            "applicableto": options.get("applicableto"),
-        }
-        return self._make_request("ProcessingActivityCreate", data, request_metadata)
+        error = _missing_fields(activity=options.get("activity"))
+        if error:
+            return error
+        data = _pick(options, "activity", "title", "script", "fulldesc", "applicableto")
+        result = self._make_request("ProcessingActivityCreate", data, request_metadata)
+        self._invalidate("ProcessingActivity")
+        return result
 
     def update_processing_activity(
         self,
@@ -894,25 +1712,23 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Update an existing processing activity."""
-        data: Dict[str, Any] = {"activity": activity}
-        if options.get("newactivity") is not None:
-            data["newactivity"] = options["newactivity"]
-        if options.get("title") is not None:
-            data["title"] = options["title"]
-        if options.get("script") is not None:
-            data["script"] = options["script"]
-        if options.get("fulldesc") is not None:
-            data["fulldesc"] = options["fulldesc"]
-        if options.get("applicableto") is not None:
-            data["applicableto"] = options["applicableto"]
-        return self._make_request("ProcessingActivityUpdate", data, request_metadata)
+        data: Dict[str, Any] = {
+            "activity": activity,
+            **{key: value for key, value in options.items() if value is not None},
+        }
+        result = self._make_request("ProcessingActivityUpdate", data, request_metadata)
+        self._invalidate("ProcessingActivity")
+        return result
 
     def delete_processing_activity(
         self, activity: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Delete a processing activity."""
-        data = {"activity": activity}
-        return self._make_request("ProcessingActivityDelete", data, request_metadata)
+        result = self._make_request(
+            "ProcessingActivityDelete", {"activity": activity}, request_metadata
+        )
+        self._invalidate("ProcessingActivity")
+        return result
 
     def link_processing_activity_to_legal_basis(
         self,
@@ -925,9 +1741,11 @@ class DatabunkerproAPI:
             "activity": activity,
             "brief": brief,
         }
-        return self._make_request(
+        result = self._make_request(
             "ProcessingActivityLinkLegalBasis", data, request_metadata
         )
+        self._invalidate("ProcessingActivity")
+        return result
 
     def unlink_processing_activity_from_legal_basis(
         self,
@@ -940,9 +1758,11 @@ class DatabunkerproAPI:
             "activity": activity,
             "brief": brief,
         }
-        return self._make_request(
+        result = self._make_request(
             "ProcessingActivityUnlinkLegalBasis", data, request_metadata
         )
+        self._invalidate("ProcessingActivity")
+        return result
 
     # Group Management
     def create_group(
@@ -951,12 +1771,13 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create a new group."""
-        data = {
-            "groupname": options.get("groupname"),
-            "groupdesc": options.get("groupdesc"),
-            "grouptype": options.get("grouptype"),
-        }
-        return self._make_request("GroupCreate", data, request_metadata)
+        error = _missing_fields(groupname=options.get("groupname"))
+        if error:
+            return error
+        data = _pick(options, "groupname", "groupdesc", "grouptype")
+        result = self._make_request("GroupCreate", data, request_metadata)
+        self._invalidate("Group")
+        return result
 
     def get_group(
         self,
@@ -965,17 +1786,15 @@ class DatabunkerproAPI:
     ) -> Dict[str, Any]:
         """Get group information."""
         data: Dict[str, Any] = {}
-        if isinstance(group_ref, int) or str(group_ref).isdigit():
-            data["groupid"] = int(group_ref)
-        else:
-            data["groupname"] = str(group_ref)
-        return self._make_request("GroupGet", data, request_metadata)
+        key, value = _ref_field(group_ref, "groupname", "groupid")
+        data[key] = value
+        return self._cached_request("GroupGet", data, request_metadata)
 
     def list_all_groups(
         self, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """List all groups in the system."""
-        return self._make_request("GroupListAllGroups", None, request_metadata)
+        return self._cached_request("GroupListAllGroups", None, request_metadata)
 
     def list_user_groups(
         self,
@@ -997,9 +1816,10 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Update group information."""
-        data = {**options}
-        data["groupid"] = int(group_id)
-        return self._make_request("GroupUpdate", data, request_metadata)
+        data: Dict[str, Any] = {**options, "groupid": int(group_id)}
+        result = self._make_request("GroupUpdate", data, request_metadata)
+        self._invalidate("Group")
+        return result
 
     def delete_group(
         self,
@@ -1008,11 +1828,11 @@ class DatabunkerproAPI:
     ) -> Dict[str, Any]:
         """Delete a group."""
         data: Dict[str, Any] = {}
-        if isinstance(group_ref, int) or str(group_ref).isdigit():
-            data["groupid"] = int(group_ref)
-        else:
-            data["groupname"] = str(group_ref)
-        return self._make_request("GroupDelete", data, request_metadata)
+        key, value = _ref_field(group_ref, "groupname", "groupid")
+        data[key] = value
+        result = self._make_request("GroupDelete", data, request_metadata)
+        self._invalidate("Group")
+        return result
 
     def remove_user_from_group(
         self,
@@ -1023,11 +1843,11 @@ class DatabunkerproAPI:
     ) -> Dict[str, Any]:
         """Remove a user from a group."""
         data: Dict[str, Any] = {"mode": mode, "identity": identity}
-        if isinstance(group_ref, int) or str(group_ref).isdigit():
-            data["groupid"] = int(group_ref)
-        else:
-            data["groupname"] = str(group_ref)
-        return self._make_request("GroupDeleteUser", data, request_metadata)
+        key, value = _ref_field(group_ref, "groupname", "groupid")
+        data[key] = value
+        result = self._make_request("GroupDeleteUser", data, request_metadata)
+        self._invalidate("Group")
+        return result
 
     def add_user_to_group(
         self,
@@ -1039,16 +1859,14 @@ class DatabunkerproAPI:
     ) -> Dict[str, Any]:
         """Add a user to a group with an optional role."""
         data: Dict[str, Any] = {"mode": mode, "identity": identity}
-        if isinstance(group_ref, int) or str(group_ref).isdigit():
-            data["groupid"] = int(group_ref)
-        else:
-            data["groupname"] = str(group_ref)
+        key, value = _ref_field(group_ref, "groupname", "groupid")
+        data[key] = value
         if role_ref is not None:
-            if isinstance(role_ref, int) or str(role_ref).isdigit():
-                data["roleid"] = int(role_ref)
-            else:
-                data["rolename"] = str(role_ref)
-        return self._make_request("GroupAddUser", data, request_metadata)
+            key, value = _ref_field(role_ref, "rolename", "roleid")
+            data[key] = value
+        result = self._make_request("GroupAddUser", data, request_metadata)
+        self._invalidate("Group")
+        return result
 
     # Token Management
     def create_token(
@@ -1059,9 +1877,11 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create a token for sensitive data."""
-        data = {"tokentype": token_type, "record": record}
-        if options:
-            data.update(cast(Dict[str, Any], options))
+        data: Dict[str, Any] = {
+            "tokentype": token_type,
+            "record": record,
+            **(options or {}),
+        }
         return self._make_request("TokenCreate", data, request_metadata)
 
     def create_tokens_bulk(
@@ -1069,24 +1889,36 @@ class DatabunkerproAPI:
         records: List[Dict[str, Any]],
         options: Optional[TokenOptions] = None,
         request_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """Create multiple tokens in bulk."""
-        data = {"records": records}
-        if options:
-            data.update(cast(Dict[str, Any], options))
+        """Create multiple tokens in bulk.
+
+        With batch_size set, the records are sent in concurrent requests of at
+        most that many records and the "created" lists are merged.
+        """
+        if batch_size and len(records) > batch_size:
+            return self._in_batches(
+                lambda chunk: self.create_tokens_bulk(chunk, options, request_metadata),
+                records,
+                batch_size,
+                "created",
+            )
+        data: Dict[str, Any] = {"records": records, **(options or {})}
         return self._make_request("TokenCreateBulk", data, request_metadata)
 
     def get_token(
         self, token: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Get token information from DatabunkerPro."""
-        return self._make_request("TokenGet", {"token": token}, request_metadata)
+        return self._cached_request("TokenGet", {"token": token}, request_metadata)
 
     def delete_token(
         self, token: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Delete a token from DatabunkerPro."""
-        return self._make_request("TokenDelete", {"token": token}, request_metadata)
+        result = self._make_request("TokenDelete", {"token": token}, request_metadata)
+        self._invalidate("Token")
+        return result
 
     # Audit Management
     def list_user_audit_events(
@@ -1106,6 +1938,21 @@ class DatabunkerproAPI:
         }
         return self._make_request("AuditListUserEvents", data, request_metadata)
 
+    def iter_user_audit_events(
+        self,
+        mode: str,
+        identity: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all of a user's audit events, prefetching the next page."""
+        return self._iter_pages(
+            lambda offset, limit: self.list_user_audit_events(
+                mode, identity, offset, limit, request_metadata
+            ),
+            page_size,
+        )
+
     def get_audit_event(
         self, audit_event_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
@@ -1119,12 +1966,10 @@ class DatabunkerproAPI:
         self, options: TenantOptions, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Create a new tenant."""
-        data = {
-            "tenantname": options.get("tenantname"),
-            "tenantorg": options.get("tenantorg"),
-            "email": options.get("email"),
-        }
-        return self._make_request("TenantCreate", data, request_metadata)
+        data = _pick(options, "tenantname", "tenantorg", "email")
+        result = self._make_request("TenantCreate", data, request_metadata)
+        self._invalidate("Tenant")
+        return result
 
     def get_tenant(
         self,
@@ -1132,7 +1977,7 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Get tenant information."""
-        return self._make_request(
+        return self._cached_request(
             "TenantGet", {"tenantid": tenant_id}, request_metadata
         )
 
@@ -1143,14 +1988,13 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Update tenant information."""
-        data: Dict[str, Any] = {"tenantid": tenant_id}
-        if options.get("tenantname") is not None:
-            data["tenantname"] = options["tenantname"]
-        if options.get("tenantorg") is not None:
-            data["tenantorg"] = options["tenantorg"]
-        if options.get("email") is not None:
-            data["email"] = options["email"]
-        return self._make_request("TenantUpdate", data, request_metadata)
+        data: Dict[str, Any] = {
+            "tenantid": tenant_id,
+            **{key: value for key, value in options.items() if value is not None},
+        }
+        result = self._make_request("TenantUpdate", data, request_metadata)
+        self._invalidate("Tenant")
+        return result
 
     def delete_tenant(
         self,
@@ -1158,8 +2002,11 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Delete a tenant."""
-        data = {"tenantid": tenant_id}
-        return self._make_request("TenantDelete", data, request_metadata)
+        result = self._make_request(
+            "TenantDelete", {"tenantid": tenant_id}, request_metadata
+        )
+        self._invalidate("Tenant")
+        return result
 
     def list_tenants(
         self,
@@ -1172,7 +2019,7 @@ class DatabunkerproAPI:
             "offset": offset,
             "limit": limit,
         }
-        return self._make_request("TenantListTenants", data, request_metadata)
+        return self._cached_request("TenantListTenants", data, request_metadata)
 
     # Role Management
     def create_role(
@@ -1181,11 +2028,11 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create a new role."""
-        data = {
-            "rolename": options.get("rolename"),
-            "roledesc": options.get("roledesc"),
-        }
-        return self._make_request("RoleCreate", data, request_metadata)
+        error = _missing_fields(rolename=options.get("rolename"))
+        if error:
+            return error
+        data = _pick(options, "rolename", "roledesc")
+        return self._idempotent_request("RoleCreate", data, request_metadata)
 
     def update_role(
         self,
@@ -1194,11 +2041,8 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Update role information."""
-        data = {**options}
-        if isinstance(role_id, int) or str(role_id).isdigit():
-            data["roleid"] = int(role_id)
-        else:
-            data["rolename"] = str(role_id)
+        key, value = _ref_field(role_id, "rolename", "roleid")
+        data: Dict[str, Any] = {**options, key: value}
         return self._make_request("RoleUpdate", data, request_metadata)
 
     def link_policy(
@@ -1209,15 +2053,13 @@ class DatabunkerproAPI:
     ) -> Dict[str, Any]:
         """Link a policy to a role."""
         data: Dict[str, Any] = {}
-        if isinstance(role_ref, int) or str(role_ref).isdigit():
-            data["roleid"] = int(role_ref)
-        else:
-            data["rolename"] = str(role_ref)
-        if isinstance(policy_ref, int) or str(policy_ref).isdigit():
-            data["policyid"] = int(policy_ref)
-        else:
-            data["policyname"] = str(policy_ref)
-        return self._make_request("RoleLinkPolicy", data, request_metadata)
+        key, value = _ref_field(role_ref, "rolename", "roleid")
+        data[key] = value
+        key, value = _ref_field(policy_ref, "policyname", "policyid")
+        data[key] = value
+        result = self._make_request("RoleLinkPolicy", data, request_metadata)
+        self._invalidate("Policy")
+        return result
 
     # Policy Management
     def create_policy(
@@ -1226,12 +2068,15 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create a new policy."""
-        data = {
-            "policyname": options.get("policyname"),
-            "policydesc": options.get("policydesc"),
-            "policy": options.get("policy"),
-        }
-        return self._make_request("PolicyCreate", data, request_metadata)
+        error = _missing_fields(
+            policyname=options.get("policyname"), policy=options.get("policy")
+        )
+        if error:
+            return error
+        data = _pick(options, "policyname", "policydesc", "policy")
+        result = self._idempotent_request("PolicyCreate", data, request_metadata)
+        self._invalidate("Policy")
+        return result
 
     def update_policy(
         self,
@@ -1240,12 +2085,11 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Update policy information."""
-        data = {**options}
-        if isinstance(policy_id, int) or str(policy_id).isdigit():
-            data["policyid"] = int(policy_id)
-        else:
-            data["policyname"] = str(policy_id)
-        return self._make_request("PolicyUpdate", data, request_metadata)
+        key, value = _ref_field(policy_id, "policyname", "policyid")
+        data: Dict[str, Any] = {**options, key: value}
+        result = self._make_request("PolicyUpdate", data, request_metadata)
+        self._invalidate("Policy")
+        return result
 
     def get_policy(
         self,
@@ -1254,17 +2098,31 @@ class DatabunkerproAPI:
     ) -> Dict[str, Any]:
         """Get policy information."""
         data: Dict[str, Any] = {}
-        if isinstance(policy_ref, int) or str(policy_ref).isdigit():
-            data["policyid"] = int(policy_ref)
-        else:
-            data["policyname"] = str(policy_ref)
-        return self._make_request("PolicyGet", data, request_metadata)
+        key, value = _ref_field(policy_ref, "policyname", "policyid")
+        data[key] = value
+        return self._cached_request("PolicyGet", data, request_metadata)
+
+    def get_policies_bulk(
+        self,
+        policy_refs: List[Union[str, int]],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get information for several policies, one result per entry in policy_refs."""
+        return self._fan_out(
+            lambda ref: self.get_policy(ref, request_metadata), policy_refs
+        )
 
     def list_policies(
         self, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """List all policies with enhanced information."""
-        return self._make_request("PolicyListAllPolicies", None, request_metadata)
+        return self._cached_request("PolicyListAllPolicies", None, request_metadata)
+
+    def iter_policies(
+        self, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all policies without loading the whole list at once."""
+        return self._iter_rows("PolicyListAllPolicies", None, request_metadata)
 
     # Bulk Operations
     def bulk_list_unlock(
@@ -1301,6 +2159,23 @@ class DatabunkerproAPI:
         }
         return self._make_request("BulkListAllUsers", data, request_metadata)
 
+    def iter_all_users(
+        self,
+        unlock_uuid: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+        prefetch: int = 1,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all users of a bulk operation, prefetching the next
+        prefetch pages."""
+        return self._iter_pages(
+            lambda offset, limit: self.bulk_list_all_users(
+                unlock_uuid, offset, limit, request_metadata
+            ),
+            page_size,
+            prefetch,
+        )
+
     def bulk_list_group_users(
         self,
         unlock_uuid: str,
@@ -1315,10 +2190,8 @@ class DatabunkerproAPI:
             "offset": offset,
             "limit": limit,
         }
-        if isinstance(group_ref, int) or str(group_ref).isdigit():
-            data["groupid"] = int(group_ref)
-        else:
-            data["groupname"] = str(group_ref)
+        key, value = _ref_field(group_ref, "groupname", "groupid")
+        data[key] = value
         return self._make_request("BulkListGroupUsers", data, request_metadata)
 
     def bulk_list_all_user_requests(
@@ -1336,6 +2209,23 @@ class DatabunkerproAPI:
         }
         return self._make_request("BulkListAllUserRequests", data, request_metadata)
 
+    def iter_all_user_requests(
+        self,
+        unlock_uuid: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+        prefetch: int = 1,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all user requests of a bulk operation, prefetching the
+        next prefetch pages."""
+        return self._iter_pages(
+            lambda offset, limit: self.bulk_list_all_user_requests(
+                unlock_uuid, offset, limit, request_metadata
+            ),
+            page_size,
+            prefetch,
+        )
+
     def bulk_list_all_audit_events(
         self,
         unlock_uuid: str,
@@ -1351,13 +2241,44 @@ class DatabunkerproAPI:
         }
         return self._make_request("BulkListAllAuditEvents", data, request_metadata)
 
+    def iter_all_audit_events(
+        self,
+        unlock_uuid: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+        prefetch: int = 1,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all audit events of a bulk operation, prefetching the
+        next prefetch pages."""
+        return self._iter_pages(
+            lambda offset, limit: self.bulk_list_all_audit_events(
+                unlock_uuid, offset, limit, request_metadata
+            ),
+            page_size,
+            prefetch,
+        )
+
     def bulk_list_tokens(
         self,
         unlock_uuid: str,
         tokens: List[str],
         request_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """List tokens in a bulk operation."""
+        """List tokens in a bulk operation.
+
+        With batch_size set, the tokens are sent in concurrent requests of at
+        most that many tokens and the "rows" lists are merged.
+        """
+        if batch_size and len(tokens) > batch_size:
+            return self._in_batches(
+                lambda chunk: self.bulk_list_tokens(
+                    unlock_uuid, chunk, request_metadata
+                ),
+                tokens,
+                batch_size,
+                "rows",
+            )
         data = {
             "unlockuuid": unlock_uuid,
             "tokens": tokens,
@@ -1369,22 +2290,37 @@ class DatabunkerproAPI:
         unlock_uuid: str,
         tokens: List[str],
         request_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """Delete tokens in a bulk operation."""
+        """Delete tokens in a bulk operation.
+
+        With batch_size set, the tokens are sent in concurrent requests of at
+        most that many tokens; the first failed request's result is returned.
+        """
+        if batch_size and len(tokens) > batch_size:
+            return self._in_batches(
+                lambda chunk: self.bulk_delete_tokens(
+                    unlock_uuid, chunk, request_metadata
+                ),
+                tokens,
+                batch_size,
+            )
         data = {
             "unlockuuid": unlock_uuid,
             "tokens": tokens,
         }
-        return self._make_request("BulkDeleteTokens", data, request_metadata)
+        result = self._make_request("BulkDeleteTokens", data, request_metadata)
+        self._invalidate("Token")
+        return result
 
     # System Configuration
     def get_ui_conf(self) -> Dict[str, Any]:
         """Get UI configuration."""
-        return self._make_request("TenantGetUIConf")
+        return self._cached_request("TenantGetUIConf")
 
     def get_tenant_conf(self) -> Dict[str, Any]:
         """Get tenant configuration."""
-        return self._make_request("TenantGetUIConf")
+        return self._cached_request("TenantGetUIConf")
 
     def get_user_html_report(
         self,
@@ -1442,11 +2378,11 @@ class DatabunkerproAPI:
             "unlockuuid": unlock_uuid,
         }
         if tenant_ref is not None:
-            if isinstance(tenant_ref, int) or str(tenant_ref).isdigit():
-                data["tenantid"] = int(tenant_ref)
-            else:
-                data["tenantname"] = str(tenant_ref)
-        return self._make_request("SystemDeleteUserProfiles", data, request_metadata)
+            key, value = _ref_field(tenant_ref, "tenantname", "tenantid")
+            data[key] = value
+        result = self._make_request("SystemDeleteUserProfiles", data, request_metadata)
+        self._invalidate("User")
+        return result
 
     def restore_user_profile(
         self,
@@ -1460,11 +2396,11 @@ class DatabunkerproAPI:
             "token": token,
             "unlockuuid": unlock_uuid,
         }
-        if isinstance(tenant_ref, int) or str(tenant_ref).isdigit():
-            data["tenantid"] = int(tenant_ref)
-        else:
-            data["tenantname"] = str(tenant_ref)
-        return self._make_request("SystemRestoreUserProfile", data, request_metadata)
+        key, value = _ref_field(tenant_ref, "tenantname", "tenantid")
+        data[key] = value
+        result = self._make_request("SystemRestoreUserProfile", data, request_metadata)
+        self._invalidate("User")
+        return result
 
     def get_user_report(
         self,
@@ -1490,25 +2426,18 @@ class DatabunkerproAPI:
     ) -> Dict[str, Any]:
         """Get system metrics in Prometheus format."""
         try:
-            response = requests.get(f"{self.base_url}/metrics")
-            metrics_text = response.text
-            return self.parse_prometheus_metrics(metrics_text)
+            with self._session.get(
+                self._metrics_url, stream=True, timeout=self.timeout
+            ) as response:
+                response.encoding = response.encoding or "utf-8"
+                lines = cast(Iterator[str], response.iter_lines(decode_unicode=True))
+                return _parse_metric_lines(lines)
         except Exception as e:
             return {"status": "error", "message": f"Error getting metrics: {str(e)}"}
 
     def parse_prometheus_metrics(self, metrics_text: str) -> Dict[str, Any]:
         """Parse Prometheus metrics text into a dictionary."""
-        metrics = {}
-        lines = metrics_text.split("\n")
-        for line in lines:
-            if line.startswith("#") or not line.strip():
-                continue
-            match = re.match(r"^([a-zA-Z0-9_]+)(?:{([^}]+)})?\s+([0-9.]+)$", line)
-            if match:
-                name, labels, value = match.groups()
-                metric_key = f"{name}{{{labels}}}" if labels else name
-                metrics[metric_key] = float(value)
-        return metrics
+        return _parse_metric_lines(metrics_text.splitlines())
 
     def generate_wrapping_key(
         self,
@@ -1557,8 +2486,9 @@ class DatabunkerproAPI:
             >>> print(result)
             {'status': 'ok', 'message': 'License key set successfully'}
         """
-        data = {"licensekey": license_key}
-        return self._make_request("SystemSetLicenseKey", data, request_metadata)
+        return self._make_request(
+            "SystemSetLicenseKey", {"licensekey": license_key}, request_metadata
+        )
 
     # Session Management
     def upsert_session(
@@ -1569,18 +2499,37 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create or update a session (upsert operation)."""
-        data = {"sessionuuid": session_uuid, "sessiondata": session_data}
-        if options:
-            data.update(cast(Dict[str, Any], options))
-        return self._make_request("SessionUpsert", data, request_metadata)
+        error = _missing_fields(session_uuid=session_uuid)
+        if error:
+            return error
+        data: Dict[str, Any] = {
+            "sessionuuid": session_uuid,
+            "sessiondata": session_data,
+            **(options or {}),
+        }
+        result = self._make_request("SessionUpsert", data, request_metadata)
+        self._forget_miss("SessionGet", {"sessionuuid": session_uuid})
+        return result
 
     def delete_session(
         self, session_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Delete a session."""
-        return self._make_request(
+        result = self._make_request(
             "SessionDelete", {"sessionuuid": session_uuid}, request_metadata
         )
+        self._forget_miss("SessionGet", {"sessionuuid": session_uuid})
+        return result
+
+    def delete_sessions_bulk(
+        self,
+        session_uuids: List[str],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Delete several sessions, one result per entry in session_uuids."""
+        return self._fan_out(
+            lambda uuid: self.delete_session(uuid, request_metadata), session_uuids
+        )
 
     def list_user_sessions(
         self,
@@ -1595,12 +2544,35 @@ class DatabunkerproAPI:
         }
         return self._make_request("SessionListUserSessions", data, request_metadata)
 
+    def iter_user_sessions(
+        self,
+        mode: str,
+        identity: str,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over a user's sessions without loading the whole list at once."""
+        data = {
+            "mode": mode,
+            "identity": identity,
+        }
+        return self._iter_rows("SessionListUserSessions", data, request_metadata)
+
     def get_session(
         self, session_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Get session information."""
         data = {"sessionuuid": session_uuid}
-        return self._make_request("SessionGet", data, request_metadata)
+        return self._lookup_or_miss("SessionGet", data, request_metadata)
+
+    def get_sessions_bulk(
+        self,
+        session_uuids: List[str],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get information for several sessions, one result per entry in session_uuids."""
+        return self._fan_out(
+            lambda uuid: self.get_session(uuid, request_metadata), session_uuids
+        )
 
     # Shared Record Management
     def create_shared_record(
@@ -1611,19 +2583,29 @@ class DatabunkerproAPI:
         request_metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Creates a shared record for a user."""
+        error = _missing_fields(mode=mode, identity=identity)
+        if error:
+            return error
         data = {
             "mode": mode,
             "identity": identity,
-            "fields": options.get("fields") if options else None,
-            "partner": options.get("partner") if options else None,
-            "appname": options.get("appname") if options else None,
-            "finaltime": options.get("finaltime") if options else None,
+            **_pick(options or {}, "fields", "partner", "appname", "finaltime"),
         }
-        return self._make_request("SharedRecordCreate", data, request_metadata)
+        return self._idempotent_request("SharedRecordCreate", data, request_metadata)
 
     def get_shared_record(
         self, record_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Gets a shared record by its UUID."""
         data = {"recorduuid": record_uuid}
-        return self._make_request("SharedRecordGet", data, request_metadata)
+        return self._lookup_or_miss("SharedRecordGet", data, request_metadata)
+
+    def get_shared_records_bulk(
+        self,
+        record_uuids: List[str],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get several shared records, one result per entry in record_uuids."""
+        return self._fan_out(
+            lambda uuid: self.get_shared_record(uuid, request_metadata), record_uuids
+        )
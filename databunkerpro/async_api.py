@@ -0,0 +1,895 @@
+"""DatabunkerPro asyncio API Client"""
+
+import asyncio
+import copy
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .api import (
+    AgreementAcceptOptions,
+    BasicOptions,
+    DatabunkerproError,
+    PolicyOptions,
+    PolicyUpdateOptions,
+    RoleOptions,
+    SharedRecordOptions,
+    TokenOptions,
+    UserOptions,
+    _canonical,
+    _encode_body,
+    _error_result,
+    _loads,
+    _missing_fields,
+    _optional_module,
+    _pick,
+    _ref_field,
+    _reference,
+    _user_extract,
+)
+
+httpx = _optional_module("httpx")
+
+
+class AsyncDatabunkerproAPI:
+    """Asyncio client for the DatabunkerPro API backed by httpx.AsyncClient.
+
+    Calls can be issued concurrently, for example with ``asyncio.gather``,
+    and share the client's keep-alive connection pool.
+
+    Example:
+        async with AsyncDatabunkerproAPI(url, token, tenant) as api:
+            sessions = await asyncio.gather(
+                *[api.get_session(uuid) for uuid in session_uuids]
+            )
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        x_bunker_token: str = "",
+        x_bunker_tenant: str = "",
+        http2: bool = False,
+        max_connections: int = 100,
+    ):
+        """Initialize the asyncio DatabunkerPro API client.
+
+        With http2=True concurrent calls are multiplexed as streams over a
+        single connection instead of each taking a pooled HTTP/1.1 socket.
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncDatabunkerproAPI requires httpx: "
+                "pip install 'databunkerpro[async]'"
+            )
+        self.base_url = base_url.rstrip("/")
+        self._api_url = f"{self.base_url}/v2/"
+        self.x_bunker_token = x_bunker_token
+        self.x_bunker_tenant = x_bunker_tenant
+        headers = {"Content-Type": "application/json"}
+        if self.x_bunker_token:
+            headers["X-Bunker-Token"] = self.x_bunker_token
+        if self.x_bunker_tenant:
+            headers["X-Bunker-Tenant"] = self.x_bunker_tenant
+        self.max_connections = max_connections
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._http_error: Type[Exception] = httpx.HTTPError
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections // 2,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and release pooled connections."""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncDatabunkerproAPI":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _make_request(
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a request to the DatabunkerPro API."""
+        url = self._api_url + endpoint
+        body = _encode_body(data, request_metadata)
+        try:
+            response = await self._client.post(url, content=body)
+            if not response.is_success:
+                return _error_result(response.status_code, response.content)
+            result: Dict[str, Any] = _loads(response.content)
+            return result
+        except (self._http_error, ValueError) as e:
+            return {"status": "error", "message": f"Error making request: {str(e)}"}
+
+    async def _read_request(
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a read-only request, sharing one in-flight call between
+        concurrent callers asking for the same thing.
+
+        Every caller gets its own copy of the result, so mutating it does not
+        affect the other callers.
+        """
+        if request_metadata:
+            return await self._make_request(endpoint, data, request_metadata)
+        key = f"{endpoint}:{_canonical(data)}"
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._make_request(endpoint, data))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda done: self._forget_inflight(key, done))
+        return copy.deepcopy(await asyncio.shield(pending))
+
+    def _forget_inflight(
+        self, key: str, pending: "asyncio.Future[Dict[str, Any]]"
+    ) -> None:
+        """Drop a finished read unless a newer one has already replaced it."""
+        if self._inflight.get(key) is pending:
+            del self._inflight[key]
+
+    def _invalidate(self, prefix: str) -> None:
+        """Stop sharing in-flight reads for endpoints starting with prefix.
+
+        Reads already in flight may predate a write; later callers must not
+        join them.
+        """
+        for key in [k for k in self._inflight if k.startswith(prefix)]:
+            del self._inflight[key]
+
+    async def _fan_out(
+        self,
+        call: Callable[[Any], Awaitable[Dict[str, Any]]],
+        refs: List[Any],
+    ) -> List[Dict[str, Any]]:
+        """Await call for every ref concurrently and return results in input order."""
+        limit = asyncio.Semaphore(self.max_connections)
+
+        async def bounded(ref: Any) -> Dict[str, Any]:
+            async with limit:
+                return await call(ref)
+
+        return list(await asyncio.gather(*[bounded(ref) for ref in refs]))
+
+    async def _iter_pages(
+        self,
+        fetch: Callable[[int, int], Awaitable[Dict[str, Any]]],
+        page_size: int,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield rows from fetch(offset, limit) pages, keeping up to prefetch
+        following pages in flight while the caller consumes the current one.
+
+        Stops at the first empty or short page and raises DatabunkerproError
+        on a failed one.
+        """
+        pending = deque(
+            asyncio.ensure_future(fetch(page * page_size, page_size))
+            for page in range(prefetch)
+        )
+        offset = prefetch * page_size
+        try:
+            while pending:
+                result = await pending.popleft()
+                if result.get("status") != "ok":
+                    raise DatabunkerproError(result)
+                rows = result.get("rows") or []
+                if len(rows) == page_size:
+                    pending.append(asyncio.ensure_future(fetch(offset, page_size)))
+                    offset += page_size
+                else:
+                    for task in pending:
+                        task.cancel()
+                    pending.clear()
+                for row in rows:
+                    yield row
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # User Management
+    async def create_user(
+        self,
+        profile: Dict[str, Any],
+        options: Optional[UserOptions] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a new user in DatabunkerPro."""
+        data: Dict[str, Any] = {"profile": profile}
+        if options:
+            data.update(_user_extract(options))
+        result = await self._make_request("UserCreate", data, request_metadata)
+        self._invalidate("User")
+        return result
+
+    async def get_user(
+        self,
+        mode: str,
+        identity: str,
+        version: Optional[int] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Get user information from DatabunkerPro."""
+        data: Dict[str, Any] = {
+            "mode": mode,
+            "identity": identity,
+        }
+        if version is not None:
+            data["version"] = version
+        return await self._read_request("UserGet", data, request_metadata)
+
+    async def get_users_bulk(
+        self,
+        refs: List[Tuple[str, str]],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get several (mode, identity) users concurrently, in order."""
+        return await self._fan_out(
+            lambda ref: self.get_user(ref[0], ref[1], None, request_metadata), refs
+        )
+
+    async def update_user(
+        self,
+        mode: str,
+        identity: str,
+        profile: Dict[str, Any],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Update user information in DatabunkerPro."""
+        data = {
+            "mode": mode,
+            "identity": identity,
+            "profile": profile,
+        }
+        result = await self._make_request("UserUpdate", data, request_metadata)
+        self._invalidate("User")
+        return result
+
+    async def delete_user(
+        self,
+        mode: str,
+        identity: str,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Delete a user from DatabunkerPro."""
+        data = {
+            "mode": mode,
+            "identity": identity,
+        }
+        result = await self._make_request("UserDelete", data, request_metadata)
+        self._invalidate("User")
+        self._invalidate("Appdata")
+        self._invalidate("Agreement")
+        return result
+
+    # App Data Management
+    async def get_app_data(
+        self,
+        mode: str,
+        identity: str,
+        appname: str,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Get application data for a user."""
+        data = {
+            "mode": mode,
+            "identity": identity,
+            "appname": appname,
+        }
+        return await self._read_request("AppdataGet", data, request_metadata)
+
+    # Token Management
+    async def create_token(
+        self,
+        token_type: str,
+        record: str,
+        options: Optional[TokenOptions] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a token for sensitive data."""
+        data: Dict[str, Any] = {
+            "tokentype": token_type,
+            "record": record,
+            **(options or {}),
+        }
+        return await self._make_request("TokenCreate", data, request_metadata)
+
+    async def get_token(
+        self, token: str, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get token information from DatabunkerPro."""
+        return await self._read_request("TokenGet", {"token": token}, request_metadata)
+
+    async def delete_token(
+        self, token: str, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Delete a token from DatabunkerPro."""
+        result = await self._make_request(
+            "TokenDelete", {"token": token}, request_metadata
+        )
+        self._invalidate("Token")
+        return result
+
+    # Role Management
+    async def create_role(
+        self,
+        options: RoleOptions,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a new role."""
+        error = _missing_fields(rolename=options.get("rolename"))
+        if error:
+            return error
+        data = _pick(options, "rolename", "roledesc")
+        return await self._make_request("RoleCreate", data, request_metadata)
+
+    async def update_role(
+        self,
+        role_id: Union[str, int],
+        options: RoleOptions,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Update role information."""
+        key, value = _ref_field(role_id, "rolename", "roleid")
+        data: Dict[str, Any] = {**options, key: value}
+        return await self._make_request("RoleUpdate", data, request_metadata)
+
+    async def link_policy(
+        self,
+        role_ref: Union[str, int],
+        policy_ref: Union[str, int],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Link a policy to a role."""
+        data: Dict[str, Any] = {}
+        key, value = _ref_field(role_ref, "rolename", "roleid")
+        data[key] = value
+        key, value = _ref_field(policy_ref, "policyname", "policyid")
+        data[key] = value
+        result = await self._make_request("RoleLinkPolicy", data, request_metadata)
+        self._invalidate("Policy")
+        return result
+
+    # Agreement Management
+    async def accept_agreement(
+        self,
+        mode: str,
+        identity: str,
+        brief: str,
+        options: AgreementAcceptOptions,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Accept an agreement for a user."""
+        data: Dict[str, Any] = {
+            "mode": mode,
+            "identity": identity,
+            "brief": brief,
+            **{key: value for key, value in options.items() if value},
+        }
+        result = await self._make_request("AgreementAccept", data, request_metadata)
+        self._invalidate("Agreement")
+        return result
+
+    async def get_user_agreement(
+        self,
+        mode: str,
+        identity: str,
+        brief: str,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Get a specific agreement for a user."""
+        data = {"mode": mode, "identity": identity, "brief": brief}
+        return await self._read_request("AgreementGet", data, request_metadata)
+
+    async def get_user_agreements_bulk(
+        self,
+        refs: List[Tuple[str, str, str]],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get several (mode, identity, brief) agreements concurrently, in order."""
+        return await self._fan_out(
+            lambda ref: self.get_user_agreement(
+                ref[0], ref[1], ref[2], request_metadata
+            ),
+            refs,
+        )
+
+    async def list_user_agreements(
+        self,
+        mode: str,
+        identity: str,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List all agreements for a user."""
+        data = {"mode": mode, "identity": identity}
+        return await self._read_request(
+            "AgreementListUserAgreements", data, request_metadata
+        )
+
+    async def cancel_agreement(
+        self,
+        mode: str,
+        identity: str,
+        brief: str,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Cancel an agreement for a user."""
+        data = {"mode": mode, "identity": identity, "brief": brief}
+        result = await self._make_request("AgreementCancel", data, request_metadata)
+        self._invalidate("Agreement")
+        return result
+
+    # Policy Management
+    async def create_policy(
+        self,
+        options: PolicyOptions,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a new policy."""
+        error = _missing_fields(
+            policyname=options.get("policyname"), policy=options.get("policy")
+        )
+        if error:
+            return error
+        data = _pick(options, "policyname", "policydesc", "policy")
+        result = await self._make_request("PolicyCreate", data, request_metadata)
+        self._invalidate("Policy")
+        return result
+
+    async def update_policy(
+        self,
+        policy_id: Union[str, int],
+        options: PolicyUpdateOptions,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Update policy information."""
+        key, value = _ref_field(policy_id, "policyname", "policyid")
+        data: Dict[str, Any] = {**options, key: value}
+        result = await self._make_request("PolicyUpdate", data, request_metadata)
+        self._invalidate("Policy")
+        return result
+
+    async def get_policy(
+        self,
+        policy_ref: Union[str, int],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Get policy information."""
+        data: Dict[str, Any] = {}
+        key, value = _ref_field(policy_ref, "policyname", "policyid")
+        data[key] = value
+        return await self._read_request("PolicyGet", data, request_metadata)
+
+    async def list_policies(
+        self, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """List all policies with enhanced information."""
+        return await self._read_request("PolicyListAllPolicies", None, request_metadata)
+
+    # Audit Management
+    async def list_user_audit_events(
+        self,
+        mode: str,
+        identity: str,
+        offset: int = 0,
+        limit: int = 10,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List audit events for a specific user."""
+        data = {
+            "mode": mode,
+            "identity": identity,
+            "offset": offset,
+            "limit": limit,
+        }
+        return await self._read_request("AuditListUserEvents", data, request_metadata)
+
+    async def get_audit_event(
+        self, audit_event_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get a specific audit event by UUID."""
+        data = {"auditeventuuid": audit_event_uuid}
+        return await self._read_request("AuditGetEvent", data, request_metadata)
+
+    # Bulk Operations
+    async def bulk_list_unlock(
+        self, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Start a bulk list unlock operation."""
+        return await self._make_request("BulkListUnlock", None, request_metadata)
+
+    async def bulk_list_users(
+        self,
+        unlock_uuid: str,
+        users: List[Dict[str, str]],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List specific users in a bulk operation."""
+        data = {"unlockuuid": unlock_uuid, "users": users}
+        return await self._make_request("BulkListUsers", data, request_metadata)
+
+    async def bulk_list_all_users(
+        self,
+        unlock_uuid: str,
+        offset: int = 0,
+        limit: int = 10,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List all users in a bulk operation with pagination."""
+        data = {"unlockuuid": unlock_uuid, "offset": offset, "limit": limit}
+        return await self._make_request("BulkListAllUsers", data, request_metadata)
+
+    def iter_all_users(
+        self,
+        unlock_uuid: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over all users of a bulk operation, prefetching the next
+        prefetch pages."""
+        return self._iter_pages(
+            lambda offset, limit: self.bulk_list_all_users(
+                unlock_uuid, offset, limit, request_metadata
+            ),
+            page_size,
+            prefetch,
+        )
+
+    async def bulk_list_group_users(
+        self,
+        unlock_uuid: str,
+        group_ref: Union[str, int],
+        offset: int = 0,
+        limit: int = 10,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List users in a group for a bulk operation."""
+        key, value = _ref_field(group_ref, "groupname", "groupid")
+        data: Dict[str, Any] = {
+            "unlockuuid": unlock_uuid,
+            "offset": offset,
+            "limit": limit,
+            key: value,
+        }
+        return await self._make_request("BulkListGroupUsers", data, request_metadata)
+
+    async def bulk_list_all_user_requests(
+        self,
+        unlock_uuid: str,
+        offset: int = 0,
+        limit: int = 10,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List all user requests in a bulk operation."""
+        data = {"unlockuuid": unlock_uuid, "offset": offset, "limit": limit}
+        return await self._make_request(
+            "BulkListAllUserRequests", data, request_metadata
+        )
+
+    def iter_all_user_requests(
+        self,
+        unlock_uuid: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over all user requests of a bulk operation, prefetching the
+        next prefetch pages."""
+        return self._iter_pages(
+            lambda offset, limit: self.bulk_list_all_user_requests(
+                unlock_uuid, offset, limit, request_metadata
+            ),
+            page_size,
+            prefetch,
+        )
+
+    async def bulk_list_all_audit_events(
+        self,
+        unlock_uuid: str,
+        offset: int = 0,
+        limit: int = 10,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List all audit events in a bulk operation."""
+        data = {"unlockuuid": unlock_uuid, "offset": offset, "limit": limit}
+        return await self._make_request(
+            "BulkListAllAuditEvents", data, request_metadata
+        )
+
+    def iter_all_audit_events(
+        self,
+        unlock_uuid: str,
+        page_size: int = 100,
+        request_metadata: Optional[Dict[str, Any]] = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over all audit events of a bulk operation, prefetching the
+        next prefetch pages."""
+        return self._iter_pages(
+            lambda offset, limit: self.bulk_list_all_audit_events(
+                unlock_uuid, offset, limit, request_metadata
+            ),
+            page_size,
+            prefetch,
+        )
+
+    async def bulk_list_tokens(
+        self,
+        unlock_uuid: str,
+        tokens: List[str],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List tokens in a bulk operation."""
+        data = {"unlockuuid": unlock_uuid, "tokens": tokens}
+        return await self._make_request("BulkListTokens", data, request_metadata)
+
+    # Session Management
+    async def upsert_session(
+        self,
+        session_uuid: str,
+        session_data: Dict[str, Any],
+        options: Optional[BasicOptions] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create or update a session (upsert operation)."""
+        data: Dict[str, Any] = {
+            "sessionuuid": session_uuid,
+            "sessiondata": session_data,
+            **(options or {}),
+        }
+        result = await self._make_request("SessionUpsert", data, request_metadata)
+        self._invalidate("Session")
+        return result
+
+    async def delete_session(
+        self, session_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Delete a session."""
+        result = await self._make_request(
+            "SessionDelete", {"sessionuuid": session_uuid}, request_metadata
+        )
+        self._invalidate("Session")
+        return result
+
+    async def delete_sessions_bulk(
+        self,
+        session_uuids: List[str],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Delete several sessions concurrently, one result per session UUID."""
+        return await self._fan_out(
+            lambda uuid: self.delete_session(uuid, request_metadata), session_uuids
+        )
+
+    async def list_user_sessions(
+        self,
+        mode: str,
+        identity: str,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """List sessions for a specific user."""
+        data = {
+            "mode": mode,
+            "identity": identity,
+        }
+        return await self._read_request(
+            "SessionListUserSessions", data, request_metadata
+        )
+
+    async def get_session(
+        self, session_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get session information."""
+        data = {"sessionuuid": session_uuid}
+        return await self._read_request("SessionGet", data, request_metadata)
+
+    async def get_sessions_bulk(
+        self,
+        session_uuids: List[str],
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get several sessions concurrently, one result per entry in session_uuids."""
+        return await self._fan_out(
+            lambda uuid: self.get_session(uuid, request_metadata), session_uuids
+        )
+
+    # Shared Record Management
+    async def create_shared_record(
+        self,
+        mode: str,
+        identity: str,
+        options: Optional[SharedRecordOptions] = None,
+        request_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Creates a shared record for a user."""
+        error = _missing_fields(mode=mode, identity=identity)
+        if error:
+            return error
+        data = {
+            "mode": mode,
+            "identity": identity,
+            **_pick(options or {}, "fields", "partner", "appname", "finaltime"),
+        }
+        return await self._make_request("SharedRecordCreate", data, request_metadata)
+
+    async def get_shared_record(
+        self, record_uuid: str, request_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Gets a shared record by its UUID."""
+        data = {"recorduuid": record_uuid}
+        return await self._read_request("SharedRecordGet", data, request_metadata)
+
+
+class AsyncBatcher:
+    """Coalesces single create_user/create_token calls into bulk requests.
+
+    Calls made within max_wait seconds of each other, up to max_batch of
+    them, are sent as one UserCreateBulk or TokenCreateBulk request and the
+    bulk answer is split back into one result per call. The server lists
+    the "created" entries in the order the records were sent, so entry i
+    answers call i.
+
+    A bulk request fails as a whole when any one of its records is bad, for
+    example a duplicate email. When that happens each record of the batch
+    is sent again on its own, so only the callers whose records are bad
+    get an error.
+
+    Example:
+        async with AsyncDatabunkerproAPI(url, token, tenant) as api:
+            batcher = AsyncBatcher(api)
+            results = await asyncio.gather(
+                *[batcher.create_token("creditcard", card) for card in cards]
+            )
+    """
+
+    # Endpoint each record is re-sent to when its bulk request fails.
+    _single_endpoints = {
+        "UserCreateBulk": "UserCreate",
+        "TokenCreateBulk": "TokenCreate",
+    }
+
+    def __init__(
+        self,
+        api: AsyncDatabunkerproAPI,
+        max_batch: int = 100,
+        max_wait: float = 0.01,
+    ):
+        """Initialize the batcher on top of an async API client."""
+        self.api = api
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._batches: Dict[
+            Tuple[str, str], List[Tuple[Any, "asyncio.Future[Any]"]]
+        ] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._sending: "set[asyncio.Task[None]]" = set()
+
+    async def create_user(
+        self, profile: Dict[str, Any], options: Optional[UserOptions] = None
+    ) -> Dict[str, Any]:
+        """Queue a user for creation; resolves to that user's result."""
+        opts: Dict[str, Any] = dict(options or {})
+        record: Dict[str, Any] = {"profile": profile}
+        for name_key, id_key in (("groupname", "groupid"), ("rolename", "roleid")):
+            key, value = _reference(opts, name_key, id_key)
+            if value is not None:
+                record[key] = value
+        shared: Dict[str, Any] = {
+            key: opts[key]
+            for key in ("slidingtime", "finaltime")
+            if opts.get(key) is not None
+        }
+        return await self._submit("UserCreateBulk", shared, record)
+
+    async def create_token(
+        self,
+        token_type: str,
+        record: str,
+        options: Optional[TokenOptions] = None,
+    ) -> Dict[str, Any]:
+        """Queue a token for creation; resolves to that token's result."""
+        item = {"tokentype": token_type, "record": record}
+        return await self._submit("TokenCreateBulk", dict(options or {}), item)
+
+    async def flush(self) -> None:
+        """Send every queued call now and wait for the answers."""
+        for key in list(self._batches):
+            self._flush(key)
+        if self._sending:
+            await asyncio.gather(*self._sending)
+
+    async def _submit(
+        self, endpoint: str, shared: Dict[str, Any], record: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        key = (endpoint, _canonical(shared))
+        future = asyncio.get_running_loop().create_future()
+        batch = self._batches.setdefault(key, [])
+        batch.append((record, future))
+        if len(batch) >= self.max_batch:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush, key
+            )
+        result: Dict[str, Any] = await future
+        return result
+
+    def _flush(self, key: Tuple[str, str]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._send(key, batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(
+        self,
+        key: Tuple[str, str],
+        batch: List[Tuple[Any, "asyncio.Future[Any]"]],
+    ) -> None:
+        endpoint, shared = key
+        options = _loads(shared)
+        data = {"records": [record for record, _ in batch], **options}
+        try:
+            result = await self.api._make_request(endpoint, data)
+            if result.get("status") != "ok" and len(batch) > 1:
+                single = self._single_endpoints[endpoint]
+                results = await asyncio.gather(
+                    *[
+                        self.api._make_request(single, {**options, **record})
+                        for record, _ in batch
+                    ]
+                )
+                for (_, future), one in zip(batch, results):
+                    if not future.done():
+                        future.set_result(one)
+                return
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            # Anything _make_request does not turn into an error result (for
+            # example an unserializable record) must still reach the callers.
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        created = result.get("created")
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if result.get("status") == "ok" and isinstance(created, list):
+                if index < len(created):
+                    future.set_result({"status": "ok", **created[index]})
+                else:
+                    future.set_result(
+                        {"status": "error", "message": "Missing from bulk result"}
+                    )
+            else:
+                future.set_result(result)
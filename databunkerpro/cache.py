@@ -0,0 +1,126 @@
+"""Shared cache backends for DatabunkerPro read results"""
+
+import json
+from typing import Any, Dict, Optional, Tuple
+
+
+class CacheBackend:
+    """Storage for cached read results that outlives a single client.
+
+    Pass an instance as DatabunkerproAPI(cache_backend=...) to share cached
+    answers between clients, for example across worker processes. Keys have
+    the form "scope:endpoint:params", where scope is a hash of the server
+    URL, tenant and access token, so only clients using the same credential
+    share entries. invalidate() is called with "scope:", "scope:" plus the
+    start of an endpoint name, or a whole key.
+    """
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None on a miss."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        """Store value under key for ttl seconds."""
+        raise NotImplementedError
+
+    def invalidate(self, prefix: str) -> None:
+        """Drop every entry whose key starts with prefix."""
+        raise NotImplementedError
+
+
+class RedisCache(CacheBackend):
+    """Cache backend storing results in Redis.
+
+    Takes an existing redis.Redis (or compatible) client, so the redis
+    package is only needed by callers that use this backend. Cached results
+    may hold personal data; point it at a Redis instance that is protected
+    like the rest of your PII storage.
+
+    Example:
+        api = DatabunkerproAPI(
+            url, token, tenant,
+            cache_ttl=60,
+            cache_backend=RedisCache(redis.Redis.from_url(redis_url)),
+        )
+    """
+
+    def __init__(self, client: Any, namespace: str = "databunkerpro:"):
+        self.client = client
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        # The cache is best-effort: an unreachable Redis or an entry that
+        # does not decode is treated as a miss.
+        try:
+            raw = self.client.get(self.namespace + key)
+            if raw is None:
+                return None
+            result: Dict[str, Any] = json.loads(raw)
+        except Exception:
+            return None
+        return result
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        # Each entry is also recorded in an index set per scope and endpoint,
+        # so invalidate() finds the affected keys without scanning Redis.
+        scope, endpoint = self._split(key)
+        ttl_ms = max(1, int(ttl * 1000))
+        index = self._index(scope, endpoint)
+        endpoints = self._endpoints(scope)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(
+                self.namespace + key,
+                json.dumps(value, separators=(",", ":")),
+                px=ttl_ms,
+            )
+            pipe.sadd(index, self.namespace + key)
+            pipe.pexpire(index, ttl_ms)
+            pipe.sadd(endpoints, endpoint)
+            pipe.pexpire(endpoints, ttl_ms)
+            pipe.execute()
+        except Exception:
+            pass
+
+    def invalidate(self, prefix: str) -> None:
+        # Entries that survive a failed invalidation still expire after ttl.
+        scope, endpoint_prefix = self._split(prefix)
+        # A prefix reaching past the endpoint name targets one endpoint only.
+        exact = prefix.count(":") > 1
+        try:
+            for raw in self.client.smembers(self._endpoints(scope)):
+                endpoint = _text(raw)
+                if exact and endpoint != endpoint_prefix:
+                    continue
+                if not endpoint.startswith(endpoint_prefix):
+                    continue
+                index = self._index(scope, endpoint)
+                keys = list(self.client.smembers(index))
+                if exact:
+                    full = self.namespace + prefix
+                    keys = [k for k in keys if _text(k).startswith(full)]
+                    if keys:
+                        self.client.delete(*keys)
+                        self.client.srem(index, *keys)
+                else:
+                    self.client.delete(*keys, index)
+                    self.client.srem(self._endpoints(scope), raw)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _split(key: str) -> Tuple[str, str]:
+        """Split a "scope:endpoint:params" key or prefix into scope and endpoint."""
+        scope, _, rest = key.partition(":")
+        return scope, rest.partition(":")[0]
+
+    def _index(self, scope: str, endpoint: str) -> str:
+        return f"{self.namespace}index:{scope}:{endpoint}"
+
+    def _endpoints(self, scope: str) -> str:
+        return f"{self.namespace}endpoints:{scope}"
+
+
+def _text(value: Any) -> str:
+    """Decode a value read back from Redis, which returns bytes by default."""
+    return value.decode() if isinstance(value, bytes) else str(value)
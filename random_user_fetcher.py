@@ -1,8 +1,8 @@
+import asyncio
 import os
 import random
-import time
 
-from databunkerpro import DatabunkerproAPI
+from databunkerpro import AsyncDatabunkerproAPI
 
 # Get credentials from environment
 api_url = os.getenv("DATABUNKER_API_URL", "http://localhost")
@@ -11,44 +11,39 @@ tenant_name = os.getenv("DATABUNKER_TENANT_NAME", "")
 
 
 def read_tokens_from_file(filename="user_tokens.txt"):
-    """Read tokens from file and return as a list."""
+    """Read tokens from file and return them as a tuple."""
     try:
         with open(filename, "r") as f:
-            return [line.strip() for line in f if line.strip()]
+            return tuple(filter(None, (line.strip() for line in f)))
     except FileNotFoundError:
         print(f"Error: {filename} not found")
-        return []
+        return ()
 
 
-def fetch_random_user(api, tokens):
-    """Fetch a random user record from the list of tokens."""
+async def fetch_random_users(api, tokens, count):
+    """Fetch count random user records concurrently from the list of tokens."""
     if not tokens:
         print("No tokens available")
-        return None
+        return []
 
-    token = random.choice(tokens)
-    try:
-        result = api.get_user("token", token)
+    picked = random.choices(tokens, k=count)
+    results = await api.get_users_bulk([("token", token) for token in picked])
+    users = []
+    for token, result in zip(picked, results):
         if result and result.get("status") == "ok":
-            return result
+            users.append(result)
         else:
             print(
                 f"Error fetching token {token}: {result.get('message', 'Unknown error')}"
             )
-            return None
-    except Exception as e:
-        print(f"Exception fetching token {token}: {str(e)}")
-        return None
+    return users
 
 
-def main():
+async def main():
     if not all([api_token]):
         print("Error: DATABUNKER_API_TOKEN environment variable must be set")
         return
 
-    # Initialize API client
-    api = DatabunkerproAPI(api_url, api_token, tenant_name)
-
     # Read tokens from file
     tokens = read_tokens_from_file()
     if not tokens:
@@ -60,14 +55,17 @@ def main():
     num_fetches = 5  # Number of random fetches to perform
     print(f"\nFetching {num_fetches} random users:")
 
-    for i in range(num_fetches):
-        print(f"\nFetch {i + 1}/{num_fetches}:")
-        user = fetch_random_user(api, tokens)
-        if user:
-            print(f"Successfully fetched user with token: {user.get('token', 'N/A')}")
-            print(f"User data: {user.get('profile', {})}")
-        time.sleep(1)  # Small delay between requests
+    # max_connections caps how many requests are in flight at once
+    async with AsyncDatabunkerproAPI(
+        api_url, api_token, tenant_name, max_connections=10
+    ) as api:
+        users = await fetch_random_users(api, tokens, num_fetches)
+
+    for i, user in enumerate(users):
+        print(f"\nUser {i + 1}/{len(users)}:")
+        print(f"Successfully fetched user with token: {user.get('token', 'N/A')}")
+        print(f"User data: {user.get('profile', {})}")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
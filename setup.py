@@ -27,8 +27,19 @@ setup(
     python_requires=">=3.7",
     install_requires=[
         "requests>=2.32.4",
+        "urllib3>=1.26",
     ],
     extras_require={
+        "async": [
+            "httpx[http2]>=0.24",
+        ],
+        "speedups": [
+            "orjson>=3.9",
+            "ijson>=3.1",
+        ],
+        "zstd": [
+            "zstandard>=0.18",
+        ],
         "dev": [
             "pytest>=6.0",
             "pytest-cov>=2.0",
@@ -36,6 +47,7 @@ setup(
             "isort>=5.0",
             "mypy>=0.910",
             "types-requests",
+            "orjson>=3.9",
         ],
     },
 )
@@ -2,14 +2,117 @@
 Tests for the DatabunkerPro API client.
 """
 
+import json
 import os
-import random
+import time
 import unittest
+import uuid
+from functools import lru_cache, partial
 
 import requests
 
 from databunkerpro import DatabunkerproAPI
 
+SANDBOX_URL = "https://databunker.org/api/newtenant.php"
+# Sandbox tenants are reused between runs for up to an hour, keyed by API URL.
+# Set DATABUNKER_NO_CACHE to always provision a fresh tenant.
+SANDBOX_CACHE = os.path.expanduser("~/.cache/databunkerpro_test_tenant.json")
+SANDBOX_CACHE_TTL = 3600
+# (connect, read) timeout in seconds, so a hung server fails the run instead
+# of stalling it
+TIMEOUT = (5, 30)
+
+
+def read_tenant_cache():
+    """Return the tenant cache file contents if it is fresh enough, else {}."""
+    try:
+        if time.time() - os.path.getmtime(SANDBOX_CACHE) > SANDBOX_CACHE_TTL:
+            return {}
+        with open(SANDBOX_CACHE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cached_tenant(api_url):
+    """Return the cached sandbox tenant for api_url if it still works, else None."""
+    if os.getenv("DATABUNKER_NO_CACHE"):
+        return None
+    data = read_tenant_cache().get(api_url)
+    if not data:
+        return None
+    # Sandbox tenants can be removed server-side before the cache expires
+    with DatabunkerproAPI(
+        api_url, data["xtoken"], data["tenantname"], timeout=TIMEOUT
+    ) as api:
+        if api.get_system_stats().get("status") != "ok":
+            return None
+    return data
+
+
+def save_cached_tenant(api_url, data):
+    """Store the sandbox tenant for later runs, replacing the file atomically."""
+    try:
+        cache = {**read_tenant_cache(), api_url: data}
+        os.makedirs(os.path.dirname(SANDBOX_CACHE), exist_ok=True)
+        tmp_path = f"{SANDBOX_CACHE}.{os.getpid()}.tmp"
+        # The cache holds tenant tokens, so keep it readable by the owner only.
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, SANDBOX_CACHE)
+    except OSError:
+        pass
+
+
+def unique_id():
+    """Return a random id that will not collide across parallel test runs."""
+    return uuid.uuid4().hex[:10]
+
+
+def unique_phone(uid):
+    """Derive a numeric phone number from a unique_id() value."""
+    return str(int(uid, 16))[:10]
+
+
+def new_profile():
+    """Return a test user profile built from one unique id."""
+    uid = unique_id()
+    return {
+        "email": f"test{uid}@example.com",
+        "name": f"Test User {uid}",
+        "phone": unique_phone(uid),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_test_credentials():
+    """Return (api_url, api_token, tenant_name), resolved once per test run."""
+    # Try to get credentials from environment first
+    api_url = os.getenv("DATABUNKER_API_URL", "https://pro.databunker.org")
+    api_token = os.getenv("DATABUNKER_API_TOKEN", "")
+    tenant_name = os.getenv("DATABUNKER_TENANT_NAME", "")
+    if api_token and tenant_name:
+        return api_url, api_token, tenant_name
+
+    # If credentials are not in environment, try to get them from sandbox server
+    try:
+        data = load_cached_tenant(api_url)
+        if data is None:
+            response = requests.get(SANDBOX_URL, timeout=TIMEOUT)
+            if not response.ok:
+                raise unittest.SkipTest("Failed to connect to sandbox server")
+            data = response.json()
+            if not data or data.get("status") != "ok":
+                raise unittest.SkipTest("Failed to get credentials from sandbox server")
+            save_cached_tenant(api_url, data)
+    except Exception as e:
+        raise unittest.SkipTest(f"Failed to get credentials: {str(e)}")
+    print("\nSuccessfully connected to DatabunkerPro sandbox server")
+    print(f"Tenant: {data['tenantname']}")
+    print(f"API URL: {api_url}")
+    return api_url, data["xtoken"], data["tenantname"]
+
 
 class TestDatabunkerproAPI(unittest.TestCase):
     """Test cases for the DatabunkerPro API client."""
@@ -17,46 +120,43 @@ class TestDatabunkerproAPI(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up test environment before running tests."""
-        # Try to get credentials from environment first
-        cls.api_url = os.getenv("DATABUNKER_API_URL", "https://pro.databunker.org")
-        cls.api_token = os.getenv("DATABUNKER_API_TOKEN", "")
-        cls.tenant_name = os.getenv("DATABUNKER_TENANT_NAME", "")
-
-        # If credentials are not in environment, try to get them from sandbox server
-        if not all([cls.api_token, cls.tenant_name]):
-            try:
-                response = requests.get(
-                    "https://databunker.org/api/newtenant.php", verify=False
-                )
-                if response.ok:
-                    data = response.json()
-                    if data and data.get("status") == "ok":
-                        cls.tenant_name = data["tenantname"]
-                        cls.api_token = data["xtoken"]
-                        print(
-                            "\nSuccessfully connected to DatabunkerPro sandbox server"
-                        )
-                        print(f"Tenant: {cls.tenant_name}")
-                        print(f"API URL: {cls.api_url}")
-                    else:
-                        raise unittest.SkipTest(
-                            "Failed to get credentials from sandbox server"
-                        )
-                else:
-                    raise unittest.SkipTest("Failed to connect to sandbox server")
-            except Exception as e:
-                raise unittest.SkipTest(f"Failed to get credentials: {str(e)}")
+        cls.api_url, cls.api_token, cls.tenant_name = get_test_credentials()
 
         # Initialize API client
-        cls.api = DatabunkerproAPI(cls.api_url, cls.api_token, cls.tenant_name)
+        cls.api = DatabunkerproAPI(
+            cls.api_url, cls.api_token, cls.tenant_name, timeout=TIMEOUT
+        )
+
+        # Create one user shared by the read and update tests
+        profile = new_profile()
+        cls.shared_email = profile["email"]
+        result = cls.api.create_user(profile)
+        if result.get("status") != "ok":
+            raise unittest.SkipTest(
+                f"Failed to create shared test user: {result.get('message')}"
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        """Delete the shared test user and close the client's connections."""
+        result = cls.api.delete_user("email", cls.shared_email)
+        if result.get("status") != "ok":
+            print(f"Warning: Failed to delete shared user {cls.shared_email}")
+        cls.api.close()
+
+    def delete_users(self, tokens):
+        """Delete test users concurrently, warning about any that fail."""
+        results = self.api.gather(
+            [partial(self.api.delete_user, "token", token) for token in tokens]
+        )
+        for token, result in zip(tokens, results):
+            # Don't fail the test if cleanup fails
+            if result.get("status") != "ok":
+                print(f"Warning: Failed to delete user with token {token}")
 
     def test_create_user(self):
         """Test user creation."""
-        user_data = {
-            "email": f"test{random.randint(1000, 999999)}@example.com",
-            "name": f"Test User {random.randint(1000, 999999)}",
-            "phone": str(random.randint(1000, 999999)),
-        }
+        user_data = new_profile()
         result = self.api.create_user(user_data)
         self.assertIsInstance(result, dict)
         self.assertEqual(result.get("status"), "ok")
@@ -68,20 +168,12 @@ class TestDatabunkerproAPI(unittest.TestCase):
         # Create test data for multiple users
         users_data = [
             {
-                "profile": {
-                    "email": f"test{random.randint(1000, 999999)}@example.com",
-                    "name": f"Test User {random.randint(1000, 999999)}",
-                    "phone": str(random.randint(1000, 999999)),
-                },
+                "profile": new_profile(),
                 # "groupname": "test-group",
                 # "rolename": "test-role"
             },
             {
-                "profile": {
-                    "email": f"test{random.randint(1000, 999999)}@example.com",
-                    "name": f"Test User {random.randint(1000, 999999)}",
-                    "phone": str(random.randint(1000, 999999)),
-                },
+                "profile": new_profile(),
                 # "groupid": 1,
                 # "roleid": 1
             },
@@ -93,37 +185,42 @@ class TestDatabunkerproAPI(unittest.TestCase):
         self.assertEqual(result.get("status"), "ok")
         self.assertIn("created", result)
         self.assertEqual(len(result["created"]), len(users_data))
-        # Verify each created user
+        # Verify each created user, fetching them all in one bulk call
         for user_record in result["created"]:
             self.assertIn("token", user_record)
             self.assertIn("profile", user_record)
+        unlock_result = self.api.bulk_list_unlock()
+        self.assertEqual(unlock_result.get("status"), "ok")
+        list_result = self.api.bulk_list_users(
+            unlock_result["unlockuuid"],
+            [
+                {"mode": "email", "identity": user["profile"]["email"]}
+                for user in result["created"]
+            ],
+        )
+        self.assertEqual(list_result.get("status"), "ok")
+        fetched_by_email = {
+            row.get("profile", {}).get("email"): row for row in list_result["rows"]
+        }
+        for user_record in result["created"]:
+            self.assertIn(user_record["profile"]["email"], fetched_by_email)
+            fetched_record = fetched_by_email[user_record["profile"]["email"]]
             self.assertEqual(
-                user_record["profile"]["email"], user_record["profile"]["email"]
-            )
-            user_record = self.api.get_user("email", user_record["profile"]["email"])
-            self.assertEqual(
-                user_record["profile"]["email"], user_record["profile"]["email"]
-            )
-            self.assertEqual(
-                user_record["profile"]["name"], user_record["profile"]["name"]
-            )
-            self.assertEqual(
-                user_record["profile"]["phone"], user_record["profile"]["phone"]
+                fetched_record["profile"]["name"], user_record["profile"]["name"]
             )
+            self.assertIn("phone", fetched_record["profile"])
         return [user["profile"]["email"] for user in users_data]
 
     def test_get_user(self):
         """Test user retrieval."""
-        email = self.test_create_user()
-        result = self.api.get_user("email", email)
+        result = self.api.get_user("email", self.shared_email)
         self.assertIsInstance(result, dict)
         self.assertEqual(result.get("status"), "ok")
         self.assertIn("profile", result)
-        return email
 
     def test_update_user(self):
         """Test user update."""
-        email = self.test_get_user()
+        email = self.shared_email
         update_data = {"name": "Updated Test User", "phone": "+9876543210"}
         result = self.api.update_user("email", email, update_data)
         self.assertIsInstance(result, dict)
@@ -144,20 +241,19 @@ class TestDatabunkerproAPI(unittest.TestCase):
     def test_bulk_operations_workflow(self):
         """Test complete bulk operations workflow: create users, unlock bulk, and fetch all users."""
         # Step 1: Create 10 users using bulk creation
-        users_data = []
-        created_emails = []
-        for i in range(10):
-            email = f"bulktest{random.randint(1000, 999999)}@example.com"
-            created_emails.append(email)
-            users_data.append(
-                {
-                    "profile": {
-                        "email": email,
-                        "name": f"Bulk Test User {i+1}",
-                        "phone": str(random.randint(1000000, 9999999)),
-                    }
+        uids = [unique_id() for _ in range(10)]
+        created_emails = [f"bulktest{uid}@example.com" for uid in uids]
+        users_data = [
+            {
+                "profile": {
+                    "email": email,
+                    "name": f"Bulk Test User {i + 1}",
+                    "phone": unique_phone(uid),
                 }
-            )
+            }
+            for i, (uid, email) in enumerate(zip(uids, created_emails))
+        ]
+        created_email_set = frozenset(created_emails)
 
         # Create users in bulk
         bulk_options = {"finaltime": "1y", "slidingtime": "30d"}
@@ -171,6 +267,7 @@ class TestDatabunkerproAPI(unittest.TestCase):
 
         # Store created user tokens and emails for verification
         created_tokens = [user["token"] for user in create_result["created"]]
+        created_token_set = frozenset(created_tokens)
         created_user_identities = [
             {"mode": "email", "identity": user["profile"]["email"]}
             for user in create_result["created"]
@@ -210,7 +307,7 @@ class TestDatabunkerproAPI(unittest.TestCase):
             if email:  # Only check if email exists
                 self.assertIn(
                     email,
-                    created_emails,
+                    created_email_set,
                     f"Email {email} should be from our created users",
                 )
 
@@ -229,7 +326,7 @@ class TestDatabunkerproAPI(unittest.TestCase):
         found_created_users = 0
 
         for bulk_user in bulk_users:
-            if "token" in bulk_user and bulk_user["token"] in created_tokens:
+            if "token" in bulk_user and bulk_user["token"] in created_token_set:
                 found_created_users += 1
                 # Verify the user data matches what we created
                 user_profile = bulk_user.get("profile", {})
@@ -256,10 +353,10 @@ class TestDatabunkerproAPI(unittest.TestCase):
             self.assertEqual(page_result.get("status"), "ok")
 
             page_users = page_result.get("rows", [])
-            if not page_users:
-                break
-
             paginated_users.extend(page_users)
+            # A short page is the last one; no need to ask for an empty page
+            if len(page_users) < limit:
+                break
             offset += limit
 
             # Safety break to prevent infinite loops
@@ -272,34 +369,26 @@ class TestDatabunkerproAPI(unittest.TestCase):
         )
 
         # Clean up: Delete the created users
-        for token in created_tokens:
-            try:
-                delete_result = self.api.delete_user("token", token)
-                # Don't fail the test if cleanup fails
-                if delete_result.get("status") != "ok":
-                    print(f"Warning: Failed to delete user with token {token}")
-            except Exception as e:
-                print(f"Warning: Exception during cleanup for token {token}: {str(e)}")
+        self.delete_users(created_tokens)
 
         return created_tokens
 
     def test_bulk_list_users_subset(self):
         """Test bulk_list_users() method to fetch a specific subset of user records."""
         # Step 1: Create 5 users for testing
-        users_data = []
-        test_emails = []
-        for i in range(5):
-            email = f"subsettest{random.randint(1000, 999999)}@example.com"
-            test_emails.append(email)
-            users_data.append(
-                {
-                    "profile": {
-                        "email": email,
-                        "name": f"Subset Test User {i+1}",
-                        "phone": str(random.randint(1000000, 9999999)),
-                    }
+        uids = [unique_id() for _ in range(5)]
+        test_emails = [f"subsettest{uid}@example.com" for uid in uids]
+        users_data = [
+            {
+                "profile": {
+                    "email": email,
+                    "name": f"Subset Test User {i + 1}",
+                    "phone": unique_phone(uid),
                 }
-            )
+            }
+            for i, (uid, email) in enumerate(zip(uids, test_emails))
+        ]
+        test_email_set = frozenset(test_emails)
 
         # Create users in bulk
         create_result = self.api.create_users_bulk(users_data)
@@ -339,7 +428,9 @@ class TestDatabunkerproAPI(unittest.TestCase):
         for email in returned_emails:
             if email:
                 self.assertIn(
-                    email, test_emails, f"Email {email} should be from our test users"
+                    email,
+                    test_email_set,
+                    f"Email {email} should be from our test users",
                 )
 
         # Step 4: Test bulk_list_users with subset (first 3 users)
@@ -358,7 +449,9 @@ class TestDatabunkerproAPI(unittest.TestCase):
         for email in subset_emails:
             if email:
                 self.assertIn(
-                    email, test_emails, f"Email {email} should be from our test users"
+                    email,
+                    test_email_set,
+                    f"Email {email} should be from our test users",
                 )
 
         # Step 5: Test with empty users list
@@ -366,13 +459,7 @@ class TestDatabunkerproAPI(unittest.TestCase):
         self.assertEqual(empty_result.get("status"), "error")
 
         # Clean up: Delete the created users
-        for token in created_tokens:
-            try:
-                delete_result = self.api.delete_user("token", token)
-                if delete_result.get("status") != "ok":
-                    print(f"Warning: Failed to delete user with token {token}")
-            except Exception as e:
-                print(f"Warning: Exception during cleanup for token {token}: {str(e)}")
+        self.delete_users(created_tokens)
 
         return created_tokens
 
@@ -0,0 +1,960 @@
+"""
+Offline tests for the DatabunkerPro API client.
+
+These run against a mocked HTTP session and need no server.
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from databunkerpro import (
+    AsyncBatcher,
+    AsyncDatabunkerproAPI,
+    DatabunkerproAPI,
+    DatabunkerproError,
+    RedisCache,
+)
+from databunkerpro.api import _parse_metric_lines, ijson, zstandard
+from databunkerpro.async_api import httpx
+
+
+def fake_response(body, status_code=200):
+    """Return a stand-in for a requests.Response with the given JSON body."""
+    content = body if isinstance(body, bytes) else json.dumps(body).encode()
+    return mock.Mock(ok=status_code < 400, status_code=status_code, content=content)
+
+
+def stream_response(content, status_code=200):
+    """Return a stand-in for a streamed requests.Response with raw content."""
+    response = mock.MagicMock(ok=status_code < 400, status_code=status_code)
+    response.__enter__.return_value = response
+    response.content = content
+    response.raw = io.BytesIO(content)
+    return response
+
+
+def user_body(name):
+    """Return a UserGet answer for a user called name."""
+    return {"status": "ok", "profile": {"name": name}}
+
+
+class TestParseMetricLines(unittest.TestCase):
+    """Test the Prometheus text-format parser behind get_system_metrics."""
+
+    def test_samples(self):
+        metrics = _parse_metric_lines(
+            [
+                "# HELP requests_total Requests served.",
+                "# TYPE requests_total counter",
+                "requests_total 42",
+                'requests_total{code="200",method="GET"} 40 1700000000000',
+                "",
+                "uptime_seconds 12.5 1700000000000",
+            ]
+        )
+        self.assertEqual(
+            metrics,
+            {
+                "requests_total": 42.0,
+                'requests_total{code="200",method="GET"}': 40.0,
+                "uptime_seconds": 12.5,
+            },
+        )
+
+    def test_special_values(self):
+        metrics = _parse_metric_lines(["a NaN", "b +Inf", "c -Inf", "d bogus"])
+        self.assertNotEqual(metrics["a"], metrics["a"])
+        self.assertEqual(metrics["b"], float("inf"))
+        self.assertEqual(metrics["c"], float("-inf"))
+        self.assertNotIn("d", metrics)
+
+    def test_empty_labels(self):
+        metrics = _parse_metric_lines(["up{} 1", 'bad{a="1" 2', "name_only"])
+        self.assertEqual(metrics, {"up": 1.0})
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test caching, invalidation and coalescing of read requests."""
+
+    def setUp(self):
+        self.api = DatabunkerproAPI("http://localhost", "token", "tenant", cache_ttl=60)
+        self.post = self.api._session.post = mock.Mock(
+            return_value=fake_response(user_body("old"))
+        )
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_cache_hit(self):
+        first = self.api.get_user("email", "user@example.com")
+        second = self.api.get_user("email", "user@example.com")
+        self.assertEqual(first, second)
+        self.assertEqual(self.post.call_count, 1)
+
+    def test_request_metadata_bypasses_cache(self):
+        self.api.get_user("email", "user@example.com")
+        self.api.get_user("email", "user@example.com", None, {"auditor": "test"})
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_write_invalidates(self):
+        self.api.get_user("email", "user@example.com")
+        self.post.return_value = fake_response({"status": "ok"})
+        self.api.update_user("email", "user@example.com", {"name": "new"})
+        self.post.return_value = fake_response(user_body("new"))
+        result = self.api.get_user("email", "user@example.com")
+        self.assertEqual(result["profile"]["name"], "new")
+        self.assertEqual(self.post.call_count, 3)
+
+    def test_system_stats_are_not_cached(self):
+        self.api.get_system_stats()
+        self.api.get_system_stats()
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_delete_user_invalidates_agreements(self):
+        self.api.list_user_agreements("email", "user@example.com")
+        self.api.delete_user("email", "user@example.com")
+        self.api.list_user_agreements("email", "user@example.com")
+        self.assertEqual(self.post.call_count, 3)
+
+    def test_results_are_private_copies(self):
+        first = self.api.get_user("email", "user@example.com")
+        first["profile"]["name"] = "mutated"
+        second = self.api.get_user("email", "user@example.com")
+        self.assertEqual(second["profile"]["name"], "old")
+
+    def test_concurrent_reads_are_coalesced(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_post(url, data=None, headers=None, timeout=None):
+            started.set()
+            release.wait(5)
+            return fake_response(user_body("old"))
+
+        self.post.side_effect = slow_post
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    self.api.get_user("email", "user@example.com")
+                )
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(self.post.call_count, 1)
+        results[0]["profile"]["name"] = "mutated"
+        self.assertEqual(results[1]["profile"]["name"], "old")
+
+    def test_read_racing_a_write_is_not_cached(self):
+        state = {"name": "old"}
+        read_started = threading.Event()
+        release = threading.Event()
+
+        def racing_post(url, data=None, headers=None, timeout=None):
+            if url.endswith("UserGet"):
+                body = user_body(state["name"])
+                read_started.set()
+                release.wait(5)
+                return fake_response(body)
+            state["name"] = "new"
+            return fake_response({"status": "ok"})
+
+        self.post.side_effect = racing_post
+        reader = threading.Thread(
+            target=lambda: self.api.get_user("email", "user@example.com")
+        )
+        reader.start()
+        read_started.wait(5)
+        self.api.update_user("email", "user@example.com", {"name": "new"})
+        release.set()
+        reader.join(5)
+        result = self.api.get_user("email", "user@example.com")
+        self.assertEqual(result["profile"]["name"], "new")
+
+
+class TestIterRows(unittest.TestCase):
+    """Test the streamed list requests behind the iter_* methods."""
+
+    def setUp(self):
+        self.api = DatabunkerproAPI("http://localhost", "token", "tenant")
+        self.post = self.api._session.post = mock.Mock()
+
+    def tearDown(self):
+        self.api.close()
+
+    def check_both_parsers(self, check):
+        """Run check with ijson streaming (when installed) and without it."""
+        parsers = [None] if ijson is None else [ijson, None]
+        for parser in parsers:
+            with self.subTest(ijson=parser is not None):
+                with mock.patch("databunkerpro.api.ijson", parser):
+                    check()
+
+    def test_rows(self):
+        def check():
+            self.post.return_value = stream_response(
+                b'{"status":"ok","rows":[{"policyid":1,"weight":0.5}]}'
+            )
+            rows = list(self.api.iter_policies())
+            self.assertEqual(rows, [{"policyid": 1, "weight": 0.5}])
+            self.assertIsInstance(rows[0]["weight"], float)
+
+        self.check_both_parsers(check)
+
+    def test_error_status_raises(self):
+        def check():
+            self.post.return_value = stream_response(
+                b'{"status":"error","message":"access denied"}'
+            )
+            with self.assertRaises(DatabunkerproError) as caught:
+                list(self.api.iter_policies())
+            self.assertEqual(caught.exception.result["message"], "access denied")
+
+        self.check_both_parsers(check)
+
+    def test_truncated_body_raises(self):
+        def check():
+            self.post.return_value = stream_response(b'{"status":"ok","rows":[{"a"')
+            with self.assertRaises(DatabunkerproError):
+                list(self.api.iter_policies())
+
+        self.check_both_parsers(check)
+
+    def test_http_error_with_bad_json_raises(self):
+        self.post.return_value = stream_response(b"{not json", 502)
+        with self.assertRaises(DatabunkerproError) as caught:
+            list(self.api.iter_policies())
+        self.assertEqual(str(caught.exception), "API request failed (HTTP 502)")
+
+    def test_connection_error_raises(self):
+        self.post.side_effect = requests.exceptions.ConnectionError("refused")
+        with self.assertRaises(DatabunkerproError):
+            list(self.api.iter_policies())
+
+
+class TestIdempotentCreate(unittest.TestCase):
+    """Test that duplicate create calls replay the first result."""
+
+    def setUp(self):
+        self.api = DatabunkerproAPI(
+            "http://localhost", "token", "tenant", idempotency_ttl=60
+        )
+        self.post = self.api._session.post = mock.Mock(
+            return_value=fake_response({"status": "ok", "roleid": 1})
+        )
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_duplicate_is_replayed(self):
+        first = self.api.create_role({"rolename": "auditor"})
+        second = self.api.create_role({"rolename": "auditor"})
+        self.assertEqual(first, second)
+        self.assertEqual(self.post.call_count, 1)
+        headers = self.post.call_args.kwargs["headers"]
+        self.assertIn("Idempotency-Key", headers)
+
+    def test_replays_are_private_copies(self):
+        first = self.api.create_role({"rolename": "auditor"})
+        first["roleid"] = 999
+        second = self.api.create_role({"rolename": "auditor"})
+        second["extra"] = True
+        third = self.api.create_role({"rolename": "auditor"})
+        self.assertEqual(third, {"status": "ok", "roleid": 1})
+        self.assertEqual(self.post.call_count, 1)
+
+    def test_different_payloads_are_sent(self):
+        self.api.create_role({"rolename": "auditor"})
+        self.api.create_role({"rolename": "reviewer"})
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_errors_are_not_replayed(self):
+        self.post.return_value = fake_response(b"<html>Bad Gateway</html>", 502)
+        result = self.api.create_role({"rolename": "auditor"})
+        self.assertEqual(result["message"], "API request failed (HTTP 502)")
+        self.post.return_value = fake_response({"status": "ok", "roleid": 1})
+        self.assertEqual(self.api.create_role({"rolename": "auditor"})["roleid"], 1)
+        self.assertEqual(self.post.call_count, 2)
+
+
+class TestRetryAndBreaker(unittest.TestCase):
+    """Test the retry policy and the circuit breaker."""
+
+    def setUp(self):
+        self.api = DatabunkerproAPI(
+            "http://localhost",
+            "token",
+            "tenant",
+            breaker_threshold=2,
+            breaker_cooldown=60,
+        )
+        self.post = self.api._session.post = mock.Mock(
+            side_effect=requests.exceptions.ConnectionError("refused")
+        )
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_retry_policy(self):
+        retry = self.api._session.get_adapter("http://localhost/").max_retries
+        self.assertEqual(retry.total, 3)
+        self.assertEqual(retry.read, 0)
+        self.assertEqual(set(retry.status_forcelist), {429, 503})
+        self.assertIn("POST", retry.allowed_methods)
+
+    def test_breaker_opens_after_threshold(self):
+        for _ in range(2):
+            self.assertEqual(self.api.get_system_stats()["status"], "error")
+        result = self.api.get_system_stats()
+        self.assertIn("Server unavailable", result["message"])
+        self.assertEqual(self.post.call_count, 2)
+
+    def open_breaker(self):
+        """Trip the breaker with a cooldown short enough to wait out."""
+        self.api.breaker_cooldown = 0.05
+        for _ in range(2):
+            self.api.get_system_stats()
+        time.sleep(0.06)
+
+    def test_successful_probe_closes_breaker(self):
+        self.open_breaker()
+        self.post.side_effect = None
+        self.post.return_value = fake_response({"status": "ok"})
+        self.assertEqual(self.api.get_system_stats()["status"], "ok")
+        self.assertEqual(self.api.get_system_stats()["status"], "ok")
+        self.assertEqual(self.post.call_count, 4)
+
+    def test_failed_probe_reopens_breaker(self):
+        self.open_breaker()
+        self.api.get_system_stats()
+        result = self.api.get_system_stats()
+        self.assertIn("Server unavailable", result["message"])
+        self.assertEqual(self.post.call_count, 3)
+
+    def test_single_probe_while_half_open(self):
+        self.open_breaker()
+        probing = threading.Event()
+        release = threading.Event()
+
+        def slow_post(url, data=None, headers=None, timeout=None):
+            probing.set()
+            release.wait(5)
+            return fake_response({"status": "ok"})
+
+        self.post.side_effect = slow_post
+        probe = threading.Thread(target=self.api.get_system_stats)
+        probe.start()
+        probing.wait(5)
+        result = self.api.get_system_stats()
+        release.set()
+        probe.join(5)
+        self.assertIn("Server unavailable", result["message"])
+        self.assertEqual(self.post.call_count, 3)
+
+    def test_http_errors_do_not_open_breaker(self):
+        self.post.side_effect = None
+        self.post.return_value = fake_response({"status": "error"}, 500)
+        for _ in range(3):
+            self.api.get_system_stats()
+        self.assertEqual(self.post.call_count, 3)
+
+
+class TestCompression(unittest.TestCase):
+    """Test compression of large request bodies."""
+
+    def make_api(self, **kwargs):
+        api = DatabunkerproAPI(
+            "http://localhost", "token", "tenant", compress_threshold=64, **kwargs
+        )
+        self.addCleanup(api.close)
+        api._session.post = mock.Mock(return_value=fake_response({"status": "ok"}))
+        return api
+
+    def test_large_body_is_gzipped(self):
+        api = self.make_api()
+        records = [{"tokentype": "creditcard", "record": "4111" * 8}] * 4
+        api.create_tokens_bulk(records)
+        kwargs = api._session.post.call_args.kwargs
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(
+            json.loads(gzip.decompress(kwargs["data"]))["records"], records
+        )
+
+    def test_small_body_is_sent_as_is(self):
+        api = self.make_api()
+        api.get_token("abc")
+        kwargs = api._session.post.call_args.kwargs
+        self.assertIsNone(kwargs["headers"])
+        self.assertEqual(json.loads(kwargs["data"]), {"token": "abc"})
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_large_body_is_zstd_compressed(self):
+        api = self.make_api(compression="zstd")
+        records = [{"tokentype": "creditcard", "record": "4111" * 8}] * 4
+        api.create_tokens_bulk(records)
+        kwargs = api._session.post.call_args.kwargs
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "zstd")
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(kwargs["data"])
+        self.assertEqual(json.loads(body)["records"], records)
+
+    def test_zstd_requires_zstandard(self):
+        with mock.patch("databunkerpro.api.zstandard", None):
+            with self.assertRaises(ImportError):
+                DatabunkerproAPI("http://localhost", compression="zstd")
+
+    def test_unknown_compression_is_rejected(self):
+        with self.assertRaises(ValueError):
+            DatabunkerproAPI("http://localhost", compression="brotli")
+
+
+class TestOutbox(unittest.TestCase):
+    """Test calls queued with defer()."""
+
+    def make_api(self, **kwargs):
+        api = DatabunkerproAPI("http://localhost", "token", "tenant", **kwargs)
+        self.addCleanup(api.close)
+        self.sent = []
+
+        def post(url, data=None, headers=None, timeout=None):
+            time.sleep(0.01)
+            self.sent.append(json.loads(data)["token"])
+            return fake_response({"status": "ok"})
+
+        api._session.post = post
+        return api
+
+    def test_calls_are_sent_in_order(self):
+        api = self.make_api()
+        futures = [api.defer(api.delete_token, str(n)) for n in range(5)]
+        api.flush()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self.sent, ["0", "1", "2", "3", "4"])
+        self.assertEqual(futures[0].result(), {"status": "ok"})
+
+    def test_outbox_workers_send_concurrently(self):
+        api = self.make_api(outbox_workers=3)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def post(url, data=None, headers=None, timeout=None):
+            barrier.wait()
+            return fake_response({"status": "ok"})
+
+        api._session.post = post
+        futures = [api.defer(api.delete_token, str(n)) for n in range(3)]
+        api.flush(timeout=10)
+        self.assertEqual(
+            [future.result() for future in futures], [{"status": "ok"}] * 3
+        )
+
+    def test_close_sends_queued_calls(self):
+        api = self.make_api()
+        api.defer(api.delete_token, "a")
+        api.defer(api.delete_token, "b")
+        api.close()
+        self.assertEqual(self.sent, ["a", "b"])
+
+
+class TestSharedSession(unittest.TestCase):
+    """Test share_session=True."""
+
+    def setUp(self):
+        self.addCleanup(DatabunkerproAPI._shared_sessions.clear)
+
+    def make_api(self, token="token", **kwargs):
+        api = DatabunkerproAPI(
+            "http://localhost", token, "tenant", share_session=True, **kwargs
+        )
+        self.addCleanup(api.close)
+        return api
+
+    def test_same_settings_share_a_session(self):
+        self.assertIs(self.make_api()._session, self.make_api()._session)
+
+    def test_different_settings_do_not_share(self):
+        first = self.make_api()
+        self.assertIsNot(first._session, self.make_api(token="other")._session)
+        self.assertIsNot(first._session, self.make_api(pool_maxsize=2)._session)
+        private = DatabunkerproAPI("http://localhost", "token", "tenant")
+        self.addCleanup(private.close)
+        self.assertIsNot(first._session, private._session)
+
+    def test_close_keeps_shared_session_open(self):
+        api = self.make_api()
+        with mock.patch.object(api._session, "close") as close:
+            api.close()
+        close.assert_not_called()
+
+
+class TestIterPages(unittest.TestCase):
+    """Test the paged iterators such as iter_all_users."""
+
+    def setUp(self):
+        self.api = DatabunkerproAPI("http://localhost", "token", "tenant")
+        self.rows = [{"token": str(n)} for n in range(5)]
+        self.offsets = []
+        self.fail_at = None
+
+        def post(url, data=None, headers=None, timeout=None):
+            page = json.loads(data)
+            self.offsets.append(page["offset"])
+            if page["offset"] == self.fail_at:
+                return fake_response({"status": "error", "message": "page failed"})
+            rows = self.rows[page["offset"] : page["offset"] + page["limit"]]
+            return fake_response({"status": "ok", "rows": rows})
+
+        self.api._session.post = post
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_pages_until_short_page(self):
+        self.assertEqual(
+            list(self.api.iter_all_users("unlock", page_size=2)), self.rows
+        )
+        self.assertEqual(self.offsets, [0, 2, 4])
+
+    def test_exact_multiple_ends_on_empty_page(self):
+        del self.rows[4]
+        self.assertEqual(
+            list(self.api.iter_all_users("unlock", page_size=2)), self.rows
+        )
+        self.assertEqual(self.offsets, [0, 2, 4])
+
+    def test_prefetch_requests_pages_ahead(self):
+        post = self.api._session.post
+        ahead = threading.Event()
+
+        def slow_first_page(url, data=None, headers=None, timeout=None):
+            offset = json.loads(data)["offset"]
+            if offset == 2:
+                ahead.set()
+            if offset == 0:
+                # The first page is only answered once the third is requested.
+                self.assertTrue(ahead.wait(5))
+            return post(url, data, headers, timeout)
+
+        self.api._session.post = slow_first_page
+        rows = self.api.iter_all_users("unlock", page_size=1, prefetch=3)
+        self.assertEqual(list(rows), self.rows)
+
+    def test_failed_page_raises(self):
+        self.fail_at = 2
+        rows = self.api.iter_all_users("unlock", page_size=2)
+        self.assertEqual([next(rows), next(rows)], self.rows[:2])
+        with self.assertRaises(DatabunkerproError) as caught:
+            next(rows)
+        self.assertEqual(str(caught.exception), "page failed")
+
+
+class TestInBatches(unittest.TestCase):
+    """Test splitting large bulk calls into concurrent sub-batches."""
+
+    def setUp(self):
+        self.api = DatabunkerproAPI("http://localhost", "token", "tenant")
+        self.bodies = []
+        self.failing = None
+
+        def post(url, data=None, headers=None, timeout=None):
+            body = json.loads(data)
+            self.bodies.append(body)
+            items = body.get("records") or body.get("tokens")
+            if self.failing in items:
+                return fake_response({"status": "error", "message": "bad batch"})
+            return fake_response({"status": "ok", "created": items, "rows": items})
+
+        self.api._session.post = post
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_create_users_bulk_merges_created(self):
+        records = [{"profile": {"email": f"{n}@example.com"}} for n in range(7)]
+        result = self.api.create_users_bulk(records, {"finaltime": "1y"}, batch_size=3)
+        self.assertEqual(result, {"status": "ok", "created": records})
+        self.assertEqual(
+            sorted(len(body["records"]) for body in self.bodies), [1, 3, 3]
+        )
+        self.assertTrue(all(body["finaltime"] == "1y" for body in self.bodies))
+
+    def test_failed_batch_is_reported_with_merged_rest(self):
+        records = [{"profile": {"email": f"{n}@example.com"}} for n in range(4)]
+        self.failing = records[3]
+        result = self.api.create_users_bulk(records, batch_size=2)
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["message"], "bad batch")
+        self.assertEqual(result["created"], records[:2])
+
+    def test_bulk_list_tokens_merges_rows(self):
+        tokens = [f"t{n}" for n in range(5)]
+        result = self.api.bulk_list_tokens("unlock", tokens, batch_size=2)
+        self.assertEqual(result, {"status": "ok", "rows": tokens})
+        self.assertEqual(len(self.bodies), 3)
+        self.assertTrue(all(body["unlockuuid"] == "unlock" for body in self.bodies))
+
+    def test_bulk_delete_tokens_reports_failed_batch(self):
+        tokens = [f"t{n}" for n in range(5)]
+        self.failing = "t4"
+        result = self.api.bulk_delete_tokens("unlock", tokens, batch_size=2)
+        self.assertEqual(result, {"status": "error", "message": "bad batch"})
+        self.assertEqual(len(self.bodies), 3)
+
+    def test_create_tokens_bulk_merges_created(self):
+        records = [{"tokentype": "creditcard", "record": str(n)} for n in range(5)]
+        result = self.api.create_tokens_bulk(
+            records, {"slidingtime": "1d"}, batch_size=2
+        )
+        self.assertEqual(result, {"status": "ok", "created": records})
+        self.assertEqual(len(self.bodies), 3)
+        self.assertTrue(all(body["slidingtime"] == "1d" for body in self.bodies))
+
+    def test_small_call_is_sent_whole(self):
+        records = [{"profile": {"email": "a@example.com"}}]
+        self.api.create_users_bulk(records, batch_size=3)
+        self.assertEqual(len(self.bodies), 1)
+
+
+class TestNotFoundCache(unittest.TestCase):
+    """Test remembering "not found" answers with negative_cache_ttl."""
+
+    def setUp(self):
+        self.api = DatabunkerproAPI(
+            "http://localhost", "token", "tenant", negative_cache_ttl=60
+        )
+        self.missing = {"status": "error", "message": "Session not found"}
+        self.post = self.api._session.post = mock.Mock(
+            return_value=fake_response(self.missing, 404)
+        )
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_not_found_is_remembered(self):
+        self.assertEqual(self.api.get_session("s1"), self.missing)
+        self.assertEqual(self.api.get_session("s1"), self.missing)
+        self.api.get_session("s2")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_other_errors_are_not_remembered(self):
+        self.post.return_value = fake_response({"status": "error"}, 500)
+        self.api.get_session("s1")
+        self.api.get_session("s1")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_tombstone_expires(self):
+        self.api.negative_cache_ttl = 0.01
+        self.api.get_session("s1")
+        time.sleep(0.02)
+        self.api.get_session("s1")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_request_metadata_bypasses_tombstone(self):
+        self.api.get_session("s1")
+        self.api.get_session("s1", {"auditor": "test"})
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_upsert_forgets_tombstone(self):
+        self.api.get_session("s1")
+        self.post.return_value = fake_response({"status": "ok"})
+        self.api.upsert_session("s1", {"cart": []})
+        self.assertEqual(self.api.get_session("s1"), {"status": "ok"})
+        self.assertEqual(self.post.call_count, 3)
+
+
+class FakeRedis:
+    """In-memory stand-in for the parts of redis.Redis that RedisCache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value.encode()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key.decode() if isinstance(key, bytes) else key, None)
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(m.encode() for m in members)
+
+    def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def pexpire(self, key, ms):
+        pass
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+
+class TestRedisCache(unittest.TestCase):
+    """Test sharing cached results through RedisCache."""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.post = mock.Mock(return_value=fake_response(user_body("old")))
+
+    def make_api(self, token="token"):
+        api = DatabunkerproAPI(
+            "http://localhost",
+            token,
+            "tenant",
+            cache_ttl=60,
+            cache_backend=RedisCache(self.redis),
+        )
+        self.addCleanup(api.close)
+        api._session.post = self.post
+        return api
+
+    def test_clients_with_same_credential_share_entries(self):
+        self.make_api().get_user("email", "user@example.com")
+        self.make_api().get_user("email", "user@example.com")
+        self.assertEqual(self.post.call_count, 1)
+        self.make_api(token="other").get_user("email", "user@example.com")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_write_invalidates_only_its_endpoints(self):
+        api = self.make_api()
+        api.get_user("email", "user@example.com")
+        api.get_policy("default")
+        api.update_user("email", "user@example.com", {"name": "new"})
+        api.get_user("email", "user@example.com")
+        api.get_policy("default")
+        self.assertEqual(self.post.call_count, 4)
+
+    def test_write_leaves_other_credentials_alone(self):
+        self.make_api(token="other").get_user("email", "user@example.com")
+        self.make_api().update_user("email", "user@example.com", {"name": "new"})
+        self.make_api(token="other").get_user("email", "user@example.com")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_clear_cache(self):
+        api = self.make_api()
+        api.get_user("email", "user@example.com")
+        api.get_policy("default")
+        api.clear_cache()
+        api.get_user("email", "user@example.com")
+        api.get_policy("default")
+        self.assertEqual(self.post.call_count, 4)
+
+    def test_invalidating_one_key(self):
+        cache = RedisCache(self.redis)
+        cache.set("scope:UserGet:a", {"status": "ok"}, 60)
+        cache.set("scope:UserGet:b", {"status": "ok"}, 60)
+        cache.invalidate("scope:UserGet:a")
+        self.assertIsNone(cache.get("scope:UserGet:a"))
+        self.assertEqual(cache.get("scope:UserGet:b"), {"status": "ok"})
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = RedisCache(self.redis)
+        self.redis.data["databunkerpro:scope:UserGet:a"] = b"{not json"
+        self.assertIsNone(cache.get("scope:UserGet:a"))
+
+    def test_redis_errors_are_a_miss(self):
+        client = mock.Mock()
+        client.get.side_effect = ConnectionError("redis down")
+        client.pipeline.side_effect = ConnectionError("redis down")
+        client.smembers.side_effect = ConnectionError("redis down")
+        cache = RedisCache(client)
+        self.assertIsNone(cache.get("scope:UserGet:a"))
+        cache.set("scope:UserGet:a", {"status": "ok"}, 60)
+        cache.invalidate("scope:User")
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncReadRequest(unittest.IsolatedAsyncioTestCase):
+    """Test coalescing of concurrent reads in the async client."""
+
+    async def asyncSetUp(self):
+        self.api = AsyncDatabunkerproAPI("http://localhost", "token", "tenant")
+        self.state = {"name": "old"}
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.calls = []
+
+        async def make_request(endpoint, data=None, request_metadata=None):
+            self.calls.append(endpoint)
+            if endpoint == "UserGet":
+                body = user_body(self.state["name"])
+                self.started.set()
+                await self.release.wait()
+                return body
+            self.state["name"] = "new"
+            return {"status": "ok"}
+
+        self.api._make_request = make_request
+
+    async def asyncTearDown(self):
+        await self.api.aclose()
+
+    async def test_concurrent_reads_are_coalesced(self):
+        reads = [
+            asyncio.ensure_future(self.api.get_user("email", "user@example.com"))
+            for _ in range(3)
+        ]
+        await self.started.wait()
+        self.release.set()
+        results = await asyncio.gather(*reads)
+        self.assertEqual(self.calls, ["UserGet"])
+        results[0]["profile"]["name"] = "mutated"
+        self.assertEqual(results[1]["profile"]["name"], "old")
+
+    async def test_read_racing_a_write_is_not_joined(self):
+        stale = asyncio.ensure_future(self.api.get_user("email", "user@example.com"))
+        await self.started.wait()
+        await self.api.update_user("email", "user@example.com", {"name": "new"})
+        fresh = asyncio.ensure_future(self.api.get_user("email", "user@example.com"))
+        self.release.set()
+        self.assertEqual((await stale)["profile"]["name"], "old")
+        self.assertEqual((await fresh)["profile"]["name"], "new")
+        self.assertEqual(self.calls, ["UserGet", "UserUpdate", "UserGet"])
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncIterPages(unittest.IsolatedAsyncioTestCase):
+    """Test the async paged iterators such as iter_all_users."""
+
+    async def asyncSetUp(self):
+        self.api = AsyncDatabunkerproAPI("http://localhost", "token", "tenant")
+        self.rows = [{"token": str(n)} for n in range(5)]
+        self.offsets = []
+        self.fail_at = None
+
+        async def make_request(endpoint, data=None, request_metadata=None):
+            self.offsets.append(data["offset"])
+            if data["offset"] == self.fail_at:
+                return {"status": "error", "message": "page failed"}
+            rows = self.rows[data["offset"] : data["offset"] + data["limit"]]
+            return {"status": "ok", "rows": rows}
+
+        self.api._make_request = make_request
+
+    async def asyncTearDown(self):
+        await self.api.aclose()
+
+    async def collect(self, **kwargs):
+        return [row async for row in self.api.iter_all_users("unlock", **kwargs)]
+
+    async def test_pages_until_short_page(self):
+        self.assertEqual(await self.collect(page_size=2), self.rows)
+        self.assertEqual(self.offsets, [0, 2, 4])
+
+    async def test_prefetch_requests_pages_ahead(self):
+        rows = self.api.iter_all_users("unlock", page_size=1, prefetch=3)
+        self.assertEqual(await rows.__anext__(), self.rows[0])
+        self.assertEqual(self.offsets[:3], [0, 1, 2])
+        self.assertEqual([row async for row in rows], self.rows[1:])
+
+    async def test_failed_page_raises(self):
+        self.fail_at = 2
+        with self.assertRaises(DatabunkerproError):
+            await self.collect(page_size=2)
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncBatcher(unittest.IsolatedAsyncioTestCase):
+    """Test that AsyncBatcher splits bulk answers back into per-call results."""
+
+    async def asyncSetUp(self):
+        self.api = AsyncDatabunkerproAPI("http://localhost", "token", "tenant")
+        self.api._make_request = mock.AsyncMock()
+        self.batcher = AsyncBatcher(self.api, max_wait=0.001)
+
+    async def asyncTearDown(self):
+        await self.api.aclose()
+
+    async def gather_tokens(self, records):
+        return await asyncio.gather(
+            *[self.batcher.create_token("creditcard", record) for record in records]
+        )
+
+    async def test_calls_share_one_bulk_request(self):
+        self.api._make_request.return_value = {
+            "status": "ok",
+            "created": [{"tokenuuid": "t1"}, {"tokenuuid": "t2"}],
+        }
+        results = await self.gather_tokens(["4111", "4222"])
+        self.assertEqual(
+            results,
+            [{"status": "ok", "tokenuuid": "t1"}, {"status": "ok", "tokenuuid": "t2"}],
+        )
+        self.api._make_request.assert_awaited_once()
+        endpoint, data = self.api._make_request.await_args.args
+        self.assertEqual(endpoint, "TokenCreateBulk")
+        self.assertEqual(len(data["records"]), 2)
+
+    async def test_failed_batch_is_resent_one_by_one(self):
+        error = {"status": "error", "message": "bad record"}
+
+        async def make_request(endpoint, data=None, request_metadata=None):
+            if endpoint == "TokenCreateBulk" or data["record"] == "bad":
+                return error
+            return {"status": "ok", "tokenuuid": data["record"]}
+
+        self.api._make_request.side_effect = make_request
+        results = await self.gather_tokens(["4111", "bad"])
+        self.assertEqual(results, [{"status": "ok", "tokenuuid": "4111"}, error])
+        endpoints = [call.args[0] for call in self.api._make_request.await_args_list]
+        self.assertEqual(endpoints, ["TokenCreateBulk", "TokenCreate", "TokenCreate"])
+
+    async def test_single_call_error_is_not_resent(self):
+        error = {"status": "error", "message": "denied"}
+        self.api._make_request.return_value = error
+        self.assertEqual(await self.gather_tokens(["4111"]), [error])
+        self.api._make_request.assert_awaited_once()
+
+    async def test_unset_user_options_share_a_batch(self):
+        self.api._make_request.return_value = {
+            "status": "ok",
+            "created": [{"token": "u1"}, {"token": "u2"}],
+        }
+        await asyncio.gather(
+            self.batcher.create_user({"email": "a@example.com"}),
+            self.batcher.create_user(
+                {"email": "b@example.com"}, {"finaltime": None, "slidingtime": None}
+            ),
+        )
+        endpoint, data = self.api._make_request.await_args.args
+        self.assertEqual(endpoint, "UserCreateBulk")
+        self.assertNotIn("finaltime", data)
+        self.assertEqual(len(data["records"]), 2)
+
+    async def test_short_bulk_result(self):
+        self.api._make_request.return_value = {
+            "status": "ok",
+            "created": [{"tokenuuid": "t1"}],
+        }
+        results = await self.gather_tokens(["4111", "4222"])
+        self.assertEqual(results[1]["status"], "error")
+
+    async def test_exception_reaches_every_call(self):
+        self.api._make_request.side_effect = TypeError("not serializable")
+        with self.assertRaises(TypeError):
+            await self.gather_tokens(["4111", "4222"])
+
+
+if __name__ == "__main__":
+    unittest.main()